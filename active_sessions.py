@@ -0,0 +1,81 @@
+from datetime import datetime
+
+from sqlalchemy import Integer, cast, func, literal, select, union_all, update
+
+from daily_stats import add_to_daily_stats
+from live_updates import publish_changes
+from models import db, Feed, Sleep
+from table_versions import bump_table_versions
+
+# Session logs -> their stored duration column
+SESSION_LOGS = {
+    Feed: Feed.feed_duration_min,
+    Sleep: Sleep.sleep_duration_min,
+}
+
+
+def active_sessions():
+    """
+    Feeds and sleeps still running (no end time), oldest first.
+
+    Each branch reads only the small partial index of unfinished rows.
+    """
+    branches = [
+        select(
+            literal(model.__tablename__).label("kind"),
+            model.id,
+            model.start_dt,
+        ).where(model.end_time.is_(None))
+        for model in SESSION_LOGS
+    ]
+    query = union_all(*branches).order_by("start_dt")
+    return db.session.execute(query).all()
+
+
+def stop_session(model, row_id, now=None):
+    """
+    End a running feed or sleep at `now` (default: this minute).
+
+    One UPDATE sets the end and works out the duration from the stored
+    start_dt. Returns (date, duration_min), or None when the session had
+    already ended or only starts after `now`.
+    """
+    now = now or datetime.now().replace(second=0, microsecond=0)
+    duration_col = SESSION_LOGS[model]
+
+    end_dt = literal(now, db.DateTime)
+    duration = cast(
+        (func.strftime("%s", end_dt) - func.strftime("%s", model.start_dt)) / 60,
+        Integer,
+    )
+
+    stmt = (
+        update(model)
+        .where(
+            model.id == row_id,
+            model.end_time.is_(None),
+            model.start_dt < now,
+        )
+        .values({
+            model.end_time: now.time(),
+            model.end_dt: now,
+            duration_col: duration,
+        })
+        .returning(model.date, duration_col)
+    )
+    stopped = db.session.execute(stmt).first()
+    if stopped is None:
+        db.session.rollback()
+        return None
+
+    day, duration_min = stopped
+
+    # Core UPDATE skips the session hooks, like bulk import
+    if model is Sleep:
+        add_to_daily_stats({day: {"sleep_min": duration_min}})
+    bump_table_versions(db.session.connection(), [model.__tablename__])
+    db.session.commit()
+
+    publish_changes([{"table": model.__tablename__, "id": row_id, "action": "update"}])
+
+    return day, duration_min
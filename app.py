@@ -1,18 +1,46 @@
 # stdlib
-from datetime import datetime, time, timedelta
+from datetime import datetime
 import os
 
 # Third-party
+import click
 from flask import Flask, render_template
 
 # Local
-from models import db, Diaper, Feed
+from active_sessions import active_sessions
+from archive import ARCHIVE_AFTER_DAYS, archive_entries, init_archive
+from assets import init_assets
+from backup import list_backups, restore_backup, run_backup, verify_backup
+from bulk_import import (
+    IMPORT_FORMATS,
+    IMPORT_LOGS,
+    guess_format,
+    import_records,
+    read_records,
+)
+from daily_stats import rebuild_daily_stats
+from dashboard_stats import get_dashboard_snapshot
+from metrics import init_metrics
+from models import db, DailyStat
+from routes.conditional import conditional_get
 from routes.diaper_routes import init_diaper_routes
+from routes.export_routes import init_export_routes
 from routes.feed_routes import init_feed_routes
+from routes.import_routes import init_import_routes
+from routes.live_routes import init_live_routes
 from routes.medication_routes import init_medication_routes
+from routes.offline_routes import init_offline_routes
+from routes.search_routes import init_search_routes
 from routes.sleep_routes import init_sleep_routes
+from routes.stats_routes import init_stats_routes
+from routes.timeline_routes import init_timeline_routes
 from routes.vomit_routes import init_vomit_routes
-from ui_themes import PAGE_THEMES
+from schema import upgrade_schema
+from search import rebuild_search_index, search_index_exists
+from sqlite_config import init_sqlite_pragmas
+from synthetic_data import generate_synthetic_data
+from template_cache import init_template_cache
+from ui_themes import PAGE_THEMES, register_theme_stylesheets
 
 
 def build_db_path():
@@ -46,12 +74,32 @@ def create_app():
     # Extensions
     db.init_app(app)
 
+    # SQLite connection tuning (WAL, busy timeout, caches)
+    init_sqlite_pragmas(app)
+
+    # Archive of old entries, attached read-only to every connection
+    init_archive(app)
+
+    # Request/query timing and /metrics
+    init_metrics(app)
+
+    # Fingerprinted static assets
+    init_assets(app)
+    register_theme_stylesheets()
+
     # Template helpers
     register_template_helpers(app)
 
     # Routes
     register_routes(app)
 
+    # On-disk bytecode cache; every template compiled (filters are all
+    # registered by now) before the first request
+    init_template_cache(app)
+
+    # CLI commands
+    register_commands(app)
+
     # Startup tasks
     init_db(app)
 
@@ -80,9 +128,17 @@ def register_routes(app):
     init_medication_routes(app)
     init_sleep_routes(app)
     init_vomit_routes(app)
+    init_export_routes(app)
+    init_import_routes(app)
+    init_offline_routes(app)
+    init_live_routes(app)
+    init_stats_routes(app)
+    init_timeline_routes(app)
+    init_search_routes(app)
 
     # Homepage
     @app.get("/")
+    @conditional_get("diapers", "feed", "sleep", "daily_stats", per_minute=True)
     def dashboard():
         def time_ago_parts(dt):
             delta = datetime.now() - dt
@@ -112,63 +168,27 @@ def register_routes(app):
             
             return "Unknown"
 
-        # Diaper stats for dashboard
-        last_diaper = (
-            Diaper.query
-            .order_by(Diaper.dt.desc())
-            .first()
-        )
+        def running_timer(session):
+            # Rendered now, then ticked in the browser by timers.js
+            seconds = max(0, int((datetime.now() - session.start_dt).total_seconds()))
+            hours, rest = divmod(seconds, 3600)
+            return {
+                "kind": session.kind,
+                "id": session.id,
+                "start_dt": session.start_dt,
+                "start_ms": int(session.start_dt.timestamp() * 1000),
+                "elapsed": f"{hours:02d}:{rest // 60:02d}:{rest % 60:02d}",
+            }
+
+        # Aggregated in one query, then cached until a diaper/feed write
+        snapshot = get_dashboard_snapshot()
+        last_diaper = snapshot["last_diaper"]
 
         last_diaper_ago = time_ago_parts(last_diaper.dt) if last_diaper else None
         last_diaper_type = diaper_type_label(last_diaper) if last_diaper else None
 
-        # Today's counts (resets at local midnight)
-        today_start = datetime.combine(datetime.today().date(), time.min)
-
-        wet_count = (
-            Diaper.query
-            .filter(
-                Diaper.dt >= today_start,
-                Diaper.wet_diaper_size.isnot(None),
-            )
-            .count()
-        )
-
-        bm_count = (
-            Diaper.query
-            .filter(
-                Diaper.dt >= today_start,
-                Diaper.bm_diaper_size.isnot(None),
-            )
-            .count()
-        )
-
-        # Avg feed duration (last 10 completed feeds) for dashboard
-        recent_feeds = (
-            Feed.query
-            .filter(Feed.end_time.isnot(None))
-            .order_by(Feed.date.desc(), Feed.feed_num.desc())
-            .limit(10)
-            .all()
-        )
-
-        durations_min = []
-        for f in recent_feeds:
-            start_dt = datetime.combine(f.date, f.start_time)
-            end_dt = datetime.combine(f.date, f.end_time)
-
-            # Handle feed crossing midnight
-            if end_dt <= start_dt:
-                end_dt += timedelta(days=1)
-
-            minutes = int((end_dt - start_dt).total_seconds() // 60)
-            durations_min.append(minutes)
-
-        avg_feed_duration_min = None
-
-        if durations_min:
-            avg_feed_duration_min = sum(durations_min) // len(durations_min)
-
+        # Not cached: a partial-index read, and the timers need fresh starts
+        running = [running_timer(session) for session in active_sessions()]
 
         return render_template(
             "dashboard.html",
@@ -177,16 +197,117 @@ def register_routes(app):
             last_diaper_ago_num=last_diaper_ago["num"] if last_diaper_ago else None,
             last_diaper_ago_unit=last_diaper_ago["unit"] if last_diaper_ago else None,
             last_diaper_type=last_diaper_type,
-            wet_count=wet_count,
-            bm_count=bm_count,
-            avg_feed_duration_min=avg_feed_duration_min,
+            wet_count=snapshot["wet_count"],
+            bm_count=snapshot["bm_count"],
+            avg_feed_duration_min=snapshot["avg_feed_duration_min"],
+            running=running,
             page_key="dashboard",
         )
 
 
+def register_commands(app):
+    @app.cli.command("rebuild-daily-stats")
+    def rebuild_daily_stats_command():
+        """Recompute the daily_stats rollup from the raw log tables."""
+        days = rebuild_daily_stats()
+        click.echo(f"Rebuilt daily stats for {days} days.")
+
+    @app.cli.command("rebuild-search-index")
+    def rebuild_search_index_command():
+        """Refill the full-text search index from the raw log tables."""
+        if not search_index_exists():
+            raise click.ClickException("This SQLite build has no FTS5; search is disabled.")
+        rebuild_search_index()
+        click.echo("Rebuilt search index.")
+
+    @app.cli.command("import-log")
+    @click.argument("log_name", type=click.Choice(list(IMPORT_LOGS)))
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--format", "fmt", type=click.Choice(IMPORT_FORMATS))
+    def import_log_command(log_name, path, fmt):
+        """Bulk import a CSV or NDJSON file into one log."""
+        fmt = fmt or guess_format(path) or "csv"
+
+        # utf-8-sig drops the BOM spreadsheet apps like to add
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            result = import_records(log_name, read_records(f, fmt))
+
+        for line_no, message in result["errors"]:
+            click.echo(f"line {line_no}: {message}", err=True)
+
+        click.echo(
+            f"Imported {result['inserted']} {log_name} rows "
+            f"({len(result['errors'])} skipped)."
+        )
+
+    @app.cli.command("seed-data")
+    @click.option("--days", default=365, show_default=True, help="Days of entries to generate.")
+    @click.option("--seed", default=0, show_default=True, help="Same seed, same rows.")
+    @click.option("--force", is_flag=True, help="Add to a database that already has entries.")
+    def seed_data_command(days, seed, force):
+        """Fill every log with synthetic round-the-clock entries (for testing)."""
+        if DailyStat.query.first() is not None and not force:
+            raise click.ClickException("Database already has entries; pass --force to add anyway.")
+
+        counts = generate_synthetic_data(days, seed=seed)
+        click.echo(", ".join(f"{count} {log_name}" for log_name, count in counts.items()))
+
+    @app.cli.command("archive-entries")
+    @click.option("--days", type=click.IntRange(min=1), default=ARCHIVE_AFTER_DAYS or None,
+                  help="Move entries older than this many days (default: ELI_ARCHIVE_AFTER_DAYS).")
+    def archive_entries_command(days):
+        """Move old log entries into the read-only archive database."""
+        if days is None:
+            raise click.ClickException("Pass --days or set ELI_ARCHIVE_AFTER_DAYS.")
+        moved = archive_entries(days)
+        if not moved:
+            click.echo("Nothing old enough to archive.")
+        for table, count in moved.items():
+            click.echo(f"{table}: {count}")
+
+    @app.cli.command("backup-db")
+    def backup_db_command():
+        """Write a compressed online backup now (keeps the newest 60)."""
+        path = run_backup()
+        if path is None:
+            raise click.ClickException("Another backup is already running.")
+        click.echo(f"Wrote {path}")
+
+    @app.cli.command("verify-backup")
+    @click.argument("path", required=False, type=click.Path(exists=True, dir_okay=False))
+    def verify_backup_command(path):
+        """Integrity-check a backup (default: the newest) and show row counts."""
+        if path is None:
+            backups = list_backups()
+            if not backups:
+                raise click.ClickException("No backups found.")
+            path = backups[-1]
+
+        ok, details = verify_backup(path)
+        if not ok:
+            raise click.ClickException(f"{path} is damaged: {details['integrity_check']}")
+
+        click.echo(f"{path}: ok")
+        for table, count in details.items():
+            click.echo(f"  {table}: {count} rows")
+
+    @app.cli.command("restore-backup")
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.confirmation_option(prompt="Replace the live database with this backup?")
+    def restore_backup_command(path):
+        """Verify a backup and copy it over the live database (stop the app first)."""
+        try:
+            details = restore_backup(path)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
+        click.echo(f"Restored {path} ({sum(details.values())} rows).")
+
+
 def init_db(app):
+    # Migrations only run when the stored schema version is behind
     with app.app_context():
-        db.create_all()
+        upgrade_schema()
 
 
 app = create_app()
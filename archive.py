@@ -0,0 +1,223 @@
+from datetime import date, timedelta
+import logging
+import os
+import sqlite3
+from urllib.parse import quote
+
+from sqlalchemy import MetaData, create_engine, event, func, inspect, text
+from sqlalchemy.orm import aliased
+
+from live_updates import publish_changes
+from models import db, Diaper, Feed, Medication, Sleep, Vomit
+from table_versions import bump_table_versions
+
+log = logging.getLogger(__name__)
+
+# Schema name the archive file is attached under on every connection
+ARCHIVE_SCHEMA = "archive"
+
+ARCHIVE_FILENAME = "eli_care_log_archive.db"
+
+# Entries older than this many days move to the archive before each
+# scheduled backup; 0 (the default) keeps everything in the main file
+ARCHIVE_AFTER_DAYS = int(os.environ.get("ELI_ARCHIVE_AFTER_DAYS", 0))
+
+# Model -> column whose age decides when an entry is archived
+ARCHIVE_LOGS = {
+    Diaper: Diaper.dt,
+    Feed: Feed.date,
+    Sleep: Sleep.date,
+    Medication: Medication.dt,
+    Vomit: Vomit.dt,
+}
+
+# Copies of the log tables: unqualified ones to build the archive file with,
+# and "archive."-qualified ones to query it through the ATTACH
+_archive_file_metadata = MetaData()
+_attached_metadata = MetaData()
+for _model in ARCHIVE_LOGS:
+    _model.__table__.to_metadata(_archive_file_metadata)
+    _model.__table__.to_metadata(_attached_metadata, schema=ARCHIVE_SCHEMA)
+
+
+def archive_db_path():
+    default_path = os.path.join(os.path.dirname(db.engine.url.database), ARCHIVE_FILENAME)
+    return os.environ.get("ELI_ARCHIVE_PATH", default_path)
+
+
+def ensure_archive_file(path):
+    # Archive tables (and indexes) matching the current models
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        _archive_file_metadata.create_all(engine)
+
+        inspector = inspect(engine)
+        for table in _archive_file_metadata.sorted_tables:
+            existing = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                with engine.begin() as conn:
+                    conn.execute(text(
+                        f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {col_type}'
+                    ))
+    finally:
+        engine.dispose()
+
+
+def init_archive(app):
+    """
+    Attach the archive file read-only to every database connection.
+
+    Must run before the engine opens its first connection.
+    """
+    with app.app_context():
+        # Tables are synced by schema upgrades; here only a missing file is built
+        path = archive_db_path()
+        if not os.path.exists(path):
+            ensure_archive_file(path)
+
+        uri = f"file:{quote(os.path.abspath(path))}?mode=ro"
+
+        def attach_archive(dbapi_conn, connection_record):
+            dbapi_conn.execute(f"ATTACH DATABASE '{uri}' AS {ARCHIVE_SCHEMA}")
+
+        event.listen(db.engine, "connect", attach_archive)
+
+
+def archived(model):
+    # The same model mapped onto its archive table, for read-only queries
+    table = _attached_metadata.tables[f"{ARCHIVE_SCHEMA}.{model.__tablename__}"]
+    return aliased(model, table, adapt_on_names=True)
+
+
+def log_sources(model):
+    """
+    [(entity, is_archive), ...] to query for every entry of one log.
+
+    Hot entries come from `model` itself, cold ones from archived(model);
+    ids never repeat across the two, so rows can be merged by sort key.
+    """
+    return [(model, False), (archived(model), True)]
+
+
+def log_tables(model):
+    # Core tables for the same log: hot first, then archive
+    return [
+        model.__table__,
+        _attached_metadata.tables[f"{ARCHIVE_SCHEMA}.{model.__tablename__}"],
+    ]
+
+
+def seed_log_id_sequences():
+    """
+    Move each log's AUTOINCREMENT sequence past every id in both files.
+
+    Needed whenever the hot file's sqlite_sequence may be behind the
+    archive: after the AUTOINCREMENT rebuild, and after restoring a
+    snapshot taken before later archive runs. The caller commits.
+    """
+    has_sequences = db.session.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_sequence'"
+    )).scalar()
+    if not has_sequences:
+        # Tables not rebuilt yet; the upgrade's rebuild seeds them
+        return
+
+    for model in ARCHIVE_LOGS:
+        table = model.__tablename__
+        last_id = max(
+            db.session.execute(db.select(func.max(log_table.c.id))).scalar() or 0
+            for log_table in log_tables(model)
+        )
+        db.session.execute(text("DELETE FROM sqlite_sequence WHERE name = :name"), {"name": table})
+        db.session.execute(
+            text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"),
+            {"name": table, "seq": last_id},
+        )
+
+
+def same_copy_sql(model):
+    # Subquery matching a hot row's archive copy, column for column
+    table = model.__tablename__
+    same = " AND ".join(
+        f'copy."{name}" IS main."{table}"."{name}"'
+        for name in model.__table__.columns.keys()
+    )
+    return f'SELECT 1 FROM cold."{table}" AS copy WHERE copy.id = main."{table}".id AND {same}'
+
+
+def archive_entries(older_than_days=ARCHIVE_AFTER_DAYS, today=None):
+    """
+    Move log entries older than `older_than_days` into the archive file.
+
+    Returns {table name: entries moved}. Copy and delete are two commits
+    (a WAL database and a rollback-journal one can't commit atomically
+    together); after a crash between them the next run finishes the move.
+    """
+    # search imports this module; it indexes archived entries too
+    from search import SEARCH_TABLE, reindex_archived_sql
+
+    cutoff = ((today or date.today()) - timedelta(days=older_than_days)).isoformat()
+    path = archive_db_path()
+    ensure_archive_file(path)
+
+    moved = {}
+    conn = sqlite3.connect(db.engine.url.database, timeout=30, isolation_level=None)
+    try:
+        conn.execute("ATTACH DATABASE ? AS cold", (path,))
+
+        conn.execute("BEGIN IMMEDIATE")
+        for model, age_col in ARCHIVE_LOGS.items():
+            table = model.__tablename__
+            cols = ", ".join(f'"{name}"' for name in model.__table__.columns.keys())
+            # Stored dates/datetimes are ISO text, so "< 'YYYY-MM-DD'" means
+            # "before that day". Rows copied by an interrupted run are
+            # skipped; any other id already in the archive fails the insert
+            # (ids are AUTOINCREMENT, so that means something is wrong)
+            conn.execute(
+                f'INSERT INTO cold."{table}" ({cols}) '
+                f'SELECT {cols} FROM main."{table}" '
+                f'WHERE "{age_col.key}" < ? AND NOT EXISTS ({same_copy_sql(model)})',
+                (cutoff,),
+            )
+        conn.execute("COMMIT")
+
+        # No FTS5 in this SQLite build means no index (and no triggers)
+        indexed = conn.execute(
+            "SELECT 1 FROM main.sqlite_master WHERE type = 'table' AND name = ?",
+            (SEARCH_TABLE,),
+        ).fetchone() is not None
+
+        conn.execute("BEGIN IMMEDIATE")
+        for model, age_col in ARCHIVE_LOGS.items():
+            table = model.__tablename__
+            # Only rows whose exact copy made it; seeks the age index, probes the archive by id
+            deleted = conn.execute(
+                f'DELETE FROM main."{table}" WHERE "{age_col.key}" < ? '
+                f'AND EXISTS ({same_copy_sql(model)}) RETURNING id',
+                (cutoff,),
+            ).fetchall()
+            if deleted:
+                moved[table] = len(deleted)
+                # The delete trigger dropped their search rows; archived notes stay findable
+                if indexed:
+                    conn.executemany(reindex_archived_sql(model, f'cold."{table}"'), deleted)
+        conn.execute("COMMIT")
+
+        # Hand the freed pages back so backups of the hot file shrink too
+        conn.execute("DETACH DATABASE cold")
+        if moved:
+            conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+    if moved:
+        # Raw deletes skip the session hooks, like bulk import
+        bump_table_versions(db.session.connection(), list(moved))
+        db.session.commit()
+        publish_changes([{"table": table, "id": None, "action": "archive"} for table in moved])
+        log.info("Archived entries before %s: %s", cutoff, moved)
+
+    return moved
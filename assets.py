@@ -0,0 +1,185 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+
+from flask import Response, abort, request, url_for
+
+# Hashed URLs never change content, so browsers may keep them for a year
+ASSET_MAX_AGE = 365 * 24 * 60 * 60
+
+# Only keep a gzip variant when it saves at least this much
+MIN_GZIP_SAVING = 0.1
+
+COMPRESSIBLE_TYPES = {
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "font/ttf",
+    "image/svg+xml",
+    "image/vnd.microsoft.icon",
+    "image/x-icon",
+    "text/css",
+    "text/javascript",
+}
+
+EXTRA_MIMETYPES = {
+    ".woff2": "font/woff2",
+    ".ttf": "font/ttf",
+    ".webmanifest": "application/manifest+json",
+}
+
+CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+# Logical path (as under static/) -> asset entry
+_assets = {}
+
+# Hashed path -> asset entry
+_by_hashed = {}
+
+
+def guess_mimetype(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in EXTRA_MIMETYPES:
+        return EXTRA_MIMETYPES[ext]
+    return mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+
+def hashed_name(path, data):
+    # theme.css -> theme.3f2a9c1b0d.css
+    digest = hashlib.sha256(data).hexdigest()[:10]
+    root, ext = os.path.splitext(path)
+    return f"{root}.{digest}{ext}"
+
+
+def register_asset(path, data):
+    """
+    Add (or replace) an asset under a content-hashed URL.
+
+    Used for files under static/ and for stylesheets generated at startup.
+    """
+    mimetype = guess_mimetype(path)
+
+    if mimetype == "text/css":
+        data = rewrite_css_urls(path, data)
+
+    gzipped = None
+    if mimetype in COMPRESSIBLE_TYPES or mimetype.startswith("text/"):
+        # mtime=0 keeps the bytes identical across restarts
+        candidate = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(candidate) <= len(data) * (1 - MIN_GZIP_SAVING):
+            gzipped = candidate
+
+    entry = {
+        "path": path,
+        "hashed": hashed_name(path, data),
+        "data": data,
+        "gzip": gzipped,
+        "mimetype": mimetype,
+    }
+
+    old = _assets.get(path)
+    if old is not None:
+        _by_hashed.pop(old["hashed"], None)
+
+    _assets[path] = entry
+    _by_hashed[entry["hashed"]] = entry
+
+    return entry
+
+
+def rewrite_css_urls(css_path, data):
+    # Point url(...) references at the hashed names of already-registered files
+    css_dir = posixpath.dirname(css_path)
+
+    def replace(match):
+        ref = match.group(2).strip()
+        if ref.startswith(("data:", "http:", "https:", "//", "#")):
+            return match.group(0)
+
+        target, sep, suffix = ref.partition("?")
+        target, hash_sep, fragment = target.partition("#")
+
+        if target.startswith("/static/"):
+            target = target[len("/static/"):]
+        else:
+            target = posixpath.normpath(posixpath.join(css_dir, target))
+
+        entry = _assets.get(target)
+        if entry is None:
+            return match.group(0)
+
+        url = f"/assets/{entry['hashed']}"
+        if hash_sep:
+            url += f"#{fragment}"
+        return f'url("{url}")'
+
+    return CSS_URL_RE.sub(replace, data.decode("utf-8")).encode("utf-8")
+
+
+def load_static_assets(static_folder):
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(static_folder):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for filename in filenames:
+            if filename.startswith("."):
+                continue
+            full_path = os.path.join(dirpath, filename)
+            rel_path = os.path.relpath(full_path, static_folder).replace(os.sep, "/")
+            paths.append(rel_path)
+
+    # Stylesheets last, so the files they reference already have hashed names
+    paths.sort(key=lambda p: (p.endswith(".css"), p))
+
+    for rel_path in paths:
+        with open(os.path.join(static_folder, rel_path), "rb") as f:
+            register_asset(rel_path, f.read())
+
+
+def has_asset(path):
+    return path in _assets
+
+
+def asset_paths(prefix):
+    # Static paths under a folder, e.g. whatever font files were vendored
+    return sorted(path for path in _assets if path.startswith(prefix))
+
+
+def asset_url(path):
+    entry = _assets.get(path)
+    if entry is None:
+        # Not fingerprinted (e.g. added after startup); plain static URL
+        return url_for("static", filename=path)
+    return url_for("asset", hashed_path=entry["hashed"])
+
+
+def init_assets(app):
+    load_static_assets(app.static_folder)
+
+    app.add_template_global(asset_url)
+    app.add_template_global(has_asset)
+
+    # Fingerprinted static files, precompressed and cached for good
+    @app.get("/assets/<path:hashed_path>")
+    def asset(hashed_path):
+        entry = _by_hashed.get(hashed_path)
+        if entry is None:
+            abort(404)
+
+        body = entry["data"]
+        headers = {}
+
+        if entry["gzip"] is not None:
+            headers["Vary"] = "Accept-Encoding"
+            if "gzip" in request.accept_encodings:
+                body = entry["gzip"]
+                headers["Content-Encoding"] = "gzip"
+
+        response = Response(body, mimetype=entry["mimetype"], headers=headers)
+        response.cache_control.public = True
+        response.cache_control.max_age = ASSET_MAX_AGE
+        response.cache_control.immutable = True
+
+        return response
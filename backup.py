@@ -0,0 +1,244 @@
+from datetime import datetime
+import glob
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from archive import ARCHIVE_AFTER_DAYS, archive_db_path, archive_entries, seed_log_id_sequences
+from models import db
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: single process, no lock needed
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+# Same names and retention as the old scripts/backup_db.sh, so existing
+# archives count toward the limit
+BACKUP_PREFIX = "eli_care_log_"
+BACKUP_SUFFIX = ".db.gz"
+BACKUP_KEEP = int(os.environ.get("ELI_BACKUP_KEEP", 60))
+
+# Latest copy of the archive database, rewritten only when entries move into
+# it; named outside the eli_care_log_* pattern so retention never prunes it
+ARCHIVE_BACKUP_NAME = "eli_archive.db.gz"
+
+# 0 turns the background schedule off (manual `flask backup-db` still works)
+BACKUP_INTERVAL_HOURS = float(os.environ.get("ELI_BACKUP_INTERVAL_HOURS", 24))
+
+# Pages copied per step; the source is unlocked (and writers proceed) between steps
+BACKUP_PAGES_PER_STEP = int(os.environ.get("ELI_BACKUP_PAGES_PER_STEP", 256))
+BACKUP_STEP_SLEEP = float(os.environ.get("ELI_BACKUP_STEP_SLEEP", 0.01))
+
+# Compression streams in chunks of this size
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# How often the scheduler checks whether a backup is due
+SCHEDULER_POLL_SECONDS = 15 * 60
+
+
+def database_path():
+    return db.engine.url.database
+
+
+def backup_dir():
+    default_dir = os.path.join(os.path.dirname(database_path()), "backups")
+    path = os.environ.get("ELI_BACKUP_DIR", default_dir)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def list_backups():
+    # Oldest first; the timestamped names sort by time
+    pattern = os.path.join(backup_dir(), f"{BACKUP_PREFIX}*{BACKUP_SUFFIX}")
+    return sorted(glob.glob(pattern))
+
+
+def copy_database(source_path, target_path):
+    # sqlite3 online backup, a few pages at a time so live writes keep going
+    source = sqlite3.connect(source_path, timeout=30)
+    target = sqlite3.connect(target_path)
+    try:
+        with target:
+            source.backup(target, pages=BACKUP_PAGES_PER_STEP, sleep=BACKUP_STEP_SLEEP)
+    finally:
+        target.close()
+        source.close()
+
+
+def run_backup(if_due=False):
+    """
+    Snapshot the live database into a new gzip archive and apply retention.
+
+    Returns the archive path, or None if another process is already backing
+    up (or, with if_due, when a recent enough archive already exists).
+    """
+    directory = backup_dir()
+
+    with open(os.path.join(directory, ".backup.lock"), "w") as lock_file:
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return None
+
+        # Re-checked under the lock, in case another worker just finished one
+        if if_due and not backup_due():
+            return None
+
+        # Move cold history out first, so the snapshot only holds the hot file;
+        # the archive itself only needs a fresh copy when entries moved
+        if ARCHIVE_AFTER_DAYS > 0:
+            try:
+                moved = archive_entries()
+            except Exception:
+                # A failed move leaves every entry in place; the backup still runs
+                db.session.rollback()
+                log.exception("Archiving before backup failed")
+                moved = {}
+            if moved:
+                write_gzip_snapshot(archive_db_path(), os.path.join(directory, ARCHIVE_BACKUP_NAME))
+
+        stamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
+        backup_path = os.path.join(directory, f"{BACKUP_PREFIX}{stamp}{BACKUP_SUFFIX}")
+        write_gzip_snapshot(database_path(), backup_path)
+
+        prune_backups()
+
+    return backup_path
+
+
+def write_gzip_snapshot(source_path, target_path):
+    # The backup API writes a database file, not a stream: snapshot to a
+    # temp file beside the target, then stream it through gzip
+    directory = os.path.dirname(target_path)
+    fd, snapshot_path = tempfile.mkstemp(dir=directory, suffix=".db.partial")
+    os.close(fd)
+    partial_target = target_path + ".partial"
+    try:
+        copy_database(source_path, snapshot_path)
+
+        with open(snapshot_path, "rb") as src, open(partial_target, "wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as out:
+                shutil.copyfileobj(src, out, COPY_CHUNK_SIZE)
+            raw.flush()
+            os.fsync(raw.fileno())
+
+        # Only complete archives ever carry the final name
+        os.replace(partial_target, target_path)
+    finally:
+        for path in (snapshot_path, partial_target):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def prune_backups():
+    for path in list_backups()[:-BACKUP_KEEP]:
+        os.remove(path)
+
+
+def verify_backup(archive_path):
+    """
+    Decompress an archive to a temp file and run SQLite's integrity check.
+
+    Returns (ok, {table name: row count}); ok is False with the check's
+    messages in place of counts when the snapshot is damaged.
+    """
+    fd, snapshot_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        with gzip.open(archive_path, "rb") as src, open(snapshot_path, "wb") as out:
+            shutil.copyfileobj(src, out, COPY_CHUNK_SIZE)
+
+        conn = sqlite3.connect(snapshot_path)
+        try:
+            problems = [row[0] for row in conn.execute("PRAGMA integrity_check")]
+            if problems != ["ok"]:
+                return False, {"integrity_check": problems}
+
+            tables = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT name FROM sqlite_master "
+                    "WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+                )
+            ]
+            counts = {
+                name: conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+                for name in tables
+            }
+        finally:
+            conn.close()
+
+        return True, counts
+    finally:
+        os.remove(snapshot_path)
+
+
+def restore_backup(archive_path):
+    """
+    Replace the live database contents with a verified archive.
+
+    Stop the app first; open connections would keep reading the old pages.
+    """
+    ok, details = verify_backup(archive_path)
+    if not ok:
+        raise ValueError(f"Backup failed integrity check: {details['integrity_check']}")
+
+    fd, snapshot_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        with gzip.open(archive_path, "rb") as src, open(snapshot_path, "wb") as out:
+            shutil.copyfileobj(src, out, COPY_CHUNK_SIZE)
+
+        # Copy pages into the live file, so WAL/locking stay consistent
+        db.engine.dispose()
+        copy_database(snapshot_path, database_path())
+    finally:
+        os.remove(snapshot_path)
+
+    # An older snapshot's id sequences may sit below ids archived since
+    seed_log_id_sequences()
+    db.session.commit()
+
+    return details
+
+
+def backup_due():
+    backups = list_backups()
+    if not backups:
+        return True
+    age_hours = (time.time() - os.path.getmtime(backups[-1])) / 3600
+    return age_hours >= BACKUP_INTERVAL_HOURS
+
+
+def start_backup_scheduler(app):
+    """
+    Run backups on a daemon thread whenever the newest archive is too old.
+
+    Judging by the newest file means restarts don't reset the clock, and
+    the lock in run_backup() keeps several workers from doubling up.
+    """
+    if BACKUP_INTERVAL_HOURS <= 0:
+        return None
+
+    def loop():
+        while True:
+            try:
+                with app.app_context():
+                    path = run_backup(if_due=True)
+                    if path:
+                        log.info("Wrote backup %s", path)
+            except Exception:
+                log.exception("Scheduled backup failed")
+            time.sleep(SCHEDULER_POLL_SECONDS)
+
+    thread = threading.Thread(target=loop, name="backup-scheduler", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,163 @@
+from collections import Counter, defaultdict
+import csv
+import json
+import os
+
+from archive import log_tables
+from daily_stats import ROW_STATS, add_to_daily_stats
+from live_updates import publish_changes
+from models import db, Diaper, Feed, Medication, Sleep, Vomit
+from routes.diaper_routes import parse_diaper_form
+from routes.feed_routes import parse_feed_form
+from routes.medication_routes import parse_medication_form
+from routes.sleep_routes import parse_sleep_form
+from routes.vomit_routes import parse_vomit_form
+from table_versions import bump_table_versions
+
+# Rows per executemany + commit
+IMPORT_BATCH_SIZE = 1000
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Import name -> (model, the route's form parser); imported rows use the same
+# keys as the forms, so both paths share one set of validation rules
+IMPORT_LOGS = {
+    "diaper": (Diaper, parse_diaper_form),
+    "feed": (Feed, parse_feed_form),
+    "sleep": (Sleep, parse_sleep_form),
+    "medication": (Medication, parse_medication_form),
+    "vomit": (Vomit, parse_vomit_form),
+}
+
+
+def guess_format(filename):
+    ext = os.path.splitext(filename)[1].lower().lstrip(".")
+    if ext in ("json", "jsonl"):
+        return "ndjson"
+    return ext if ext in IMPORT_FORMATS else None
+
+
+def read_records(stream, fmt):
+    """
+    Yield (line number, record dict) from a text stream of CSV or NDJSON.
+
+    CSV needs a header row using the same names as the form fields
+    (which is also what the /export endpoints write).
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_no, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield line_no, record
+
+
+def as_form(model, record):
+    # Same shape as a submitted form: every field present, values as strings
+    form = {}
+    for key in model.__table__.columns.keys():
+        value = record.get(key)
+        form[key] = "" if value is None else str(value)
+    return form
+
+
+def import_records(log_name, records):
+    """
+    Validate records with the route parsers and insert them in batches.
+
+    Returns {"inserted": count, "errors": [(line number, message), ...]}.
+    Bad rows are reported and skipped; good rows still load.
+    """
+    model, parse_form = IMPORT_LOGS[log_name]
+    columns = [key for key in model.__table__.columns.keys() if key != "id"]
+
+    inserted = 0
+    errors = []
+    batch = []
+    day_deltas = defaultdict(Counter)
+    feed_nums_taken = {}
+
+    for line_no, record in records:
+        try:
+            if not isinstance(record, dict):
+                raise ValueError("Row is not a JSON object")
+            fields = parse_form(as_form(model, record))
+            if model is Feed:
+                claim_feed_num(fields, feed_nums_taken)
+        except (KeyError, ValueError) as e:
+            errors.append((line_no, str(e)))
+            continue
+
+        # Build the row the same way the routes do, including derived columns
+        row = model(**fields)
+        if hasattr(row, "set_times"):
+            row.set_times(fields["date"], fields["start_time"], fields["end_time"])
+
+        batch.append({key: getattr(row, key) for key in columns})
+
+        day, deltas = ROW_STATS[model](row)
+        day_deltas[day].update(deltas)
+
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            inserted += insert_batch(model, batch, day_deltas)
+
+    if batch:
+        inserted += insert_batch(model, batch, day_deltas)
+
+    if inserted:
+        # Core inserts skip the session hooks; one table-wide change instead
+        publish_changes([{"table": model.__tablename__, "id": None, "action": "import"}])
+
+    return {"inserted": inserted, "errors": errors}
+
+
+def claim_feed_num(fields, taken):
+    """
+    Check an imported feed's number against its day, or assign the next one.
+
+    `taken` caches {date: set of numbers} across the import, so each day
+    is read once and rows within one file can't collide either.
+    """
+    day = fields["date"]
+    if day not in taken:
+        # Hot and archived feeds both hold numbers for the day
+        taken[day] = {
+            feed_num
+            for table in log_tables(Feed)
+            for (feed_num,) in db.session.execute(
+                db.select(table.c.feed_num).where(table.c.date == day, table.c.feed_num.isnot(None))
+            )
+        }
+    numbers = taken[day]
+
+    if fields["feed_num"] is None:
+        fields["feed_num"] = max(numbers, default=0) + 1
+    elif fields["feed_num"] in numbers:
+        raise ValueError(f"Feed #{fields['feed_num']} already exists on {day}")
+
+    numbers.add(fields["feed_num"])
+
+
+def insert_batch(model, batch, day_deltas):
+    # Rows and per-day counters as two executemany calls in one transaction
+    count = len(batch)
+
+    db.session.execute(model.__table__.insert(), batch)
+    add_to_daily_stats(day_deltas)
+
+    # Core inserts skip the flush hook, so bump the table version here
+    bump_table_versions(db.session.connection(), [model.__tablename__])
+    db.session.commit()
+
+    batch.clear()
+    day_deltas.clear()
+
+    return count
@@ -0,0 +1,174 @@
+from collections import defaultdict
+from datetime import date
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from archive import log_sources
+from models import db, DailyStat, Diaper, Feed, Medication, Sleep, Vomit
+from table_versions import bump_table_versions
+
+STAT_COLUMNS = (
+    "wet_diapers",
+    "bm_diapers",
+    "feeds",
+    "feed_ml",
+    "sleep_min",
+    "vomits",
+    "med_doses",
+)
+
+
+def diaper_stats(row):
+    return row.dt.date(), {
+        "wet_diapers": 1 if row.wet_diaper_size else 0,
+        "bm_diapers": 1 if row.bm_diaper_size else 0,
+    }
+
+
+def feed_stats(row):
+    return row.date, {
+        "feeds": 1,
+        "feed_ml": row.feed_vol_ml or 0,
+    }
+
+
+def sleep_stats(row):
+    # Sleep counts toward the day it started
+    return row.date, {
+        "sleep_min": int(row.sleep_duration_min or 0),
+    }
+
+
+def medication_stats(row):
+    return row.dt.date(), {"med_doses": 1}
+
+
+def vomit_stats(row):
+    return row.dt.date(), {"vomits": 1}
+
+
+ROW_STATS = {
+    Diaper: diaper_stats,
+    Feed: feed_stats,
+    Sleep: sleep_stats,
+    Medication: medication_stats,
+    Vomit: vomit_stats,
+}
+
+
+def daily_stats_upsert():
+    # Insert the day or bump its counters; same statement every time so it caches
+    stmt = sqlite_insert(DailyStat)
+    return stmt.on_conflict_do_update(
+        index_elements=[DailyStat.date],
+        set_={
+            name: getattr(DailyStat, name) + stmt.excluded[name]
+            for name in STAT_COLUMNS
+        },
+    )
+
+
+def add_to_daily_stats(day_deltas):
+    """
+    Apply {date: {counter: delta}} in the current transaction.
+
+    Days go out as one executemany; counters not named get a delta of 0.
+    """
+    params = [
+        {"date": day, **dict.fromkeys(STAT_COLUMNS, 0), **deltas}
+        for day, deltas in day_deltas.items()
+    ]
+    if params:
+        db.session.execute(daily_stats_upsert(), params)
+
+
+def record_daily_stats(row):
+    # Call after a row is added or updated, before commit
+    day, deltas = ROW_STATS[type(row)](row)
+    add_to_daily_stats({day: deltas})
+
+
+def retract_daily_stats(row):
+    # Call before a row is changed or deleted, while it holds its old values
+    day, deltas = ROW_STATS[type(row)](row)
+    add_to_daily_stats({day: {name: -value for name, value in deltas.items()}})
+
+
+def rebuild_daily_stats():
+    """
+    Recompute every day's counters from the raw log tables.
+    """
+    totals = defaultdict(lambda: dict.fromkeys(STAT_COLUMNS, 0))
+
+    # Hot and archived entries both count; a day may span the two
+    for diaper_rows, _ in log_sources(Diaper):
+        diaper_day = func.date(diaper_rows.dt)
+        for day, wet, bm in db.session.execute(
+            db.select(
+                diaper_day,
+                func.count(diaper_rows.wet_diaper_size),
+                func.count(diaper_rows.bm_diaper_size),
+            ).group_by(diaper_day)
+        ):
+            totals[day]["wet_diapers"] += wet
+            totals[day]["bm_diapers"] += bm
+
+    for feed_rows, _ in log_sources(Feed):
+        for day, feeds, feed_ml in db.session.execute(
+            db.select(
+                func.date(feed_rows.date),
+                func.count(),
+                func.coalesce(func.sum(feed_rows.feed_vol_ml), 0),
+            ).group_by(feed_rows.date)
+        ):
+            totals[day]["feeds"] += feeds
+            totals[day]["feed_ml"] += feed_ml
+
+    for sleep_rows, _ in log_sources(Sleep):
+        for day, sleep_min in db.session.execute(
+            db.select(
+                func.date(sleep_rows.date),
+                func.coalesce(func.sum(sleep_rows.sleep_duration_min), 0),
+            ).group_by(sleep_rows.date)
+        ):
+            totals[day]["sleep_min"] += int(sleep_min)
+
+    for med_rows, _ in log_sources(Medication):
+        med_day = func.date(med_rows.dt)
+        for day, doses in db.session.execute(
+            db.select(med_day, func.count()).group_by(med_day)
+        ):
+            totals[day]["med_doses"] += doses
+
+    for vomit_rows, _ in log_sources(Vomit):
+        vomit_day = func.date(vomit_rows.dt)
+        for day, vomits in db.session.execute(
+            db.select(vomit_day, func.count()).group_by(vomit_day)
+        ):
+            totals[day]["vomits"] += vomits
+
+    db.session.execute(db.delete(DailyStat))
+    if totals:
+        db.session.execute(
+            db.insert(DailyStat),
+            [
+                {"date": date.fromisoformat(day), **counts}
+                for day, counts in sorted(totals.items())
+            ],
+        )
+    # Core writes skip the session hooks; cached dashboards and trends read this table
+    bump_table_versions(db.session.connection(), [DailyStat.__tablename__])
+    db.session.commit()
+
+    return len(totals)
+
+
+def daily_stats_between(start_date, end_date):
+    # One row per day instead of one per event
+    return (
+        DailyStat.query
+        .filter(DailyStat.date >= start_date, DailyStat.date <= end_date)
+        .order_by(DailyStat.date)
+        .all()
+    )
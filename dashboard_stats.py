@@ -0,0 +1,100 @@
+from datetime import date
+import threading
+
+from sqlalchemy import func, select
+
+from models import db, DailyStat, Diaper, Feed
+from table_versions import read_table_versions
+
+# Tables the snapshot is built from
+DASHBOARD_TABLES = ("diapers", "feed", "daily_stats")
+
+# Process-wide dashboard snapshot, checked against the shared table versions
+# so a write in any worker process makes every worker rebuild it
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def get_dashboard_snapshot():
+    global _snapshot
+
+    today = date.today()
+    versions = read_table_versions(DASHBOARD_TABLES)
+
+    with _snapshot_lock:
+        # Today's counts reset at local midnight, so a stale day means rebuild
+        if _snapshot is None or _snapshot["day"] != today or _snapshot["versions"] != versions:
+            _snapshot = build_dashboard_snapshot(today)
+            _snapshot["versions"] = versions
+
+        return _snapshot
+
+
+def invalidate_dashboard_snapshot():
+    # Forces the next read to rebuild (the benchmark's cold case)
+    global _snapshot
+
+    with _snapshot_lock:
+        _snapshot = None
+
+
+def build_dashboard_snapshot(today):
+    # Most recent diaper (dt index lookup)
+    last_diaper = (
+        select(Diaper.dt, Diaper.wet_diaper_size, Diaper.bm_diaper_size)
+        .order_by(Diaper.dt.desc())
+        .limit(1)
+        .subquery()
+    )
+
+    # Today's wet/BM counts from the daily rollup (one row, not one per diaper)
+    today_counts = (
+        select(DailyStat.wet_diapers, DailyStat.bm_diapers)
+        .where(DailyStat.date == today)
+        .subquery()
+    )
+
+    # Last 10 completed feeds (duration is stored on write)
+    recent_feeds = (
+        select(Feed.feed_duration_min.label("duration_min"))
+        .where(Feed.feed_duration_min.isnot(None))
+        .order_by(Feed.date.desc(), Feed.feed_num.desc())
+        .limit(10)
+        .subquery()
+    )
+    feed_stats = select(
+        func.sum(recent_feeds.c.duration_min).label("total_min"),
+        func.count().label("feed_count"),
+    ).subquery()
+
+    # Single round trip: scalar subqueries over the small derived tables
+    stmt = select(
+        select(last_diaper.c.dt).scalar_subquery().label("last_dt"),
+        select(last_diaper.c.wet_diaper_size).scalar_subquery().label("last_wet"),
+        select(last_diaper.c.bm_diaper_size).scalar_subquery().label("last_bm"),
+        select(today_counts.c.wet_diapers).scalar_subquery().label("wet_count"),
+        select(today_counts.c.bm_diapers).scalar_subquery().label("bm_count"),
+        select(feed_stats.c.total_min).scalar_subquery().label("total_min"),
+        select(feed_stats.c.feed_count).scalar_subquery().label("feed_count"),
+    )
+    stats = db.session.execute(stmt).one()
+
+    last_diaper_row = None
+    if stats.last_dt is not None:
+        last_diaper_row = Diaper(
+            dt=stats.last_dt,
+            wet_diaper_size=stats.last_wet,
+            bm_diaper_size=stats.last_bm,
+        )
+
+    avg_feed_duration_min = None
+    if stats.feed_count:
+        avg_feed_duration_min = int(stats.total_min) // stats.feed_count
+
+    return {
+        "day": today,
+        "last_diaper": last_diaper_row,
+        "wet_count": stats.wet_count or 0,
+        "bm_count": stats.bm_count or 0,
+        "avg_feed_duration_min": avg_feed_duration_min,
+    }
@@ -0,0 +1,39 @@
+# Production server config: gunicorn -c gunicorn.conf.py app:app
+import os
+
+bind = os.environ.get("ELI_BIND", "0.0.0.0:5000")
+
+# One process by default: SQLite takes one writer at a time, so scale
+# with threads first. More workers still see each other's writes live
+# (each polls table_versions once a second). Each open live page holds one
+# thread; ELI_LIVE_MAX_STREAMS caps them (default: half of ELI_THREADS)
+workers = int(os.environ.get("ELI_WORKERS", 1))
+threads = int(os.environ.get("ELI_THREADS", 32))
+worker_class = "gthread"
+
+# Import app (and run startup tasks) once in the master before forking
+preload_app = True
+
+# Reuse connections from phones/tablet polling the same pages
+keepalive = int(os.environ.get("ELI_KEEPALIVE", 5))
+
+# SIGTERM (docker stop) lets in-flight requests finish before exiting
+timeout = int(os.environ.get("ELI_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("ELI_GRACEFUL_TIMEOUT", 20))
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # SQLite connections opened by the master must not be shared with workers
+    from app import app
+    from backup import start_backup_scheduler
+    from models import db
+
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+    # Threads don't survive fork, so each worker starts its own; a file
+    # lock in backup.py lets only one of them write each backup
+    start_backup_scheduler(app)
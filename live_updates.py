@@ -0,0 +1,147 @@
+from collections import deque
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import event
+
+from models import db, Diaper, Feed, Medication, Sleep, Vomit
+from table_versions import read_table_versions, take_committed_bumps
+
+log = logging.getLogger(__name__)
+
+# Log tables whose commits are pushed to open pages
+LIVE_TABLES = {
+    model.__tablename__
+    for model in (Diaper, Feed, Sleep, Medication, Vomit)
+}
+
+# Recent changes kept so a reconnecting page can catch up (Last-Event-ID)
+LIVE_BACKLOG = int(os.environ.get("ELI_LIVE_BACKLOG", 1000))
+
+# How often each process checks table_versions for other processes' writes
+LIVE_POLL_SECONDS = float(os.environ.get("ELI_LIVE_POLL_SECONDS", 1))
+
+# Process-wide change feed; subscribers wait on the condition, not the database
+_changes = deque(maxlen=LIVE_BACKLOG)
+_last_id = 0
+_changes_cond = threading.Condition()
+
+_poller = None
+_poller_lock = threading.Lock()
+
+
+def publish_changes(changes):
+    """
+    Append committed {"table", "id", "action"} changes and wake every subscriber.
+    """
+    global _last_id
+
+    if not changes:
+        return
+
+    with _changes_cond:
+        for change in changes:
+            _last_id += 1
+            _changes.append((_last_id, change))
+        _changes_cond.notify_all()
+
+
+def last_change_id():
+    with _changes_cond:
+        return _last_id
+
+
+def wait_for_changes(after_id, timeout):
+    """
+    Block up to `timeout` seconds for changes newer than `after_id`.
+
+    Returns (changes, reset). reset is True when `after_id` fell out of the
+    backlog (or is from before a restart) and the caller should reload.
+    """
+    with _changes_cond:
+        if after_id == _last_id:
+            _changes_cond.wait(timeout)
+
+        oldest_id = _changes[0][0] if _changes else _last_id + 1
+        if after_id > _last_id or after_id < oldest_id - 1:
+            return [], True
+
+        return [(change_id, change) for change_id, change in _changes if change_id > after_id], False
+
+
+def foreign_changes(seen, versions, own_bumps):
+    """
+    {"table", "id": None, "action": "change"} for tables another process wrote.
+
+    A table counts when its version moved by more than this process's own
+    committed bumps (or went backwards, after a restore). Races only ever
+    announce a change twice, never drop one.
+    """
+    return [
+        {"table": table, "id": None, "action": "change"}
+        for table, (version, _) in versions.items()
+        if not 0 <= version - seen[table][0] <= own_bumps.get(table, 0)
+    ]
+
+
+def start_change_poller(app):
+    """
+    Publish writes from other workers and CLI commands (imports, archiving).
+
+    Writes in this process are published on commit; one daemon thread per
+    process reads table_versions every LIVE_POLL_SECONDS for the rest.
+    Started by the first live page, so it runs after gunicorn forks.
+    """
+    global _poller
+
+    with _poller_lock:
+        if _poller is not None:
+            return _poller
+
+        def loop():
+            seen = None
+            while True:
+                try:
+                    with app.app_context():
+                        versions = read_table_versions(sorted(LIVE_TABLES))
+                    own_bumps = take_committed_bumps()
+                    if seen is not None:
+                        publish_changes(foreign_changes(seen, versions, own_bumps))
+                    seen = versions
+                except Exception:
+                    log.exception("Live update poll failed")
+                time.sleep(LIVE_POLL_SECONDS)
+
+        _poller = threading.Thread(target=loop, name="live-poller", daemon=True)
+        _poller.start()
+        return _poller
+
+
+@event.listens_for(db.session, "after_flush")
+def collect_flushed_changes(session, flush_context):
+    # Ids are assigned by now; hold the changes until the commit goes through
+    pending = session.info.setdefault("live_changes", [])
+
+    for action, objs in (
+        ("insert", session.new),
+        ("update", session.dirty),
+        ("delete", session.deleted),
+    ):
+        for obj in objs:
+            if obj.__table__.name not in LIVE_TABLES:
+                continue
+            if action == "update" and not session.is_modified(obj):
+                continue
+            pending.append({"table": obj.__table__.name, "id": obj.id, "action": action})
+
+
+@event.listens_for(db.session, "after_commit")
+def publish_committed_changes(session):
+    publish_changes(session.info.pop("live_changes", None))
+
+
+@event.listens_for(db.session, "after_rollback")
+def drop_rolled_back_changes(session):
+    session.info.pop("live_changes", None)
@@ -0,0 +1,204 @@
+from bisect import bisect_left
+import logging
+import os
+import threading
+import time
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+
+from models import db
+
+slow_query_log = logging.getLogger("eli.slow_query")
+
+# Seconds; SQLite queries here are mostly sub-millisecond
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1, 0.5)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+# Queries slower than this get their EXPLAIN QUERY PLAN logged (unset = off)
+SLOW_QUERY_MS = os.environ.get("ELI_SLOW_QUERY_MS")
+SLOW_QUERY_MS = float(SLOW_QUERY_MS) if SLOW_QUERY_MS else None
+
+# Only these have a query plan worth showing
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+# Label for queries run outside a request (CLI, backup thread)
+NO_ENDPOINT = "none"
+
+# name -> {"type", "help", "buckets", "series": {label tuple: values}}
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+def define_metric(name, metric_type, help_text, label_names, buckets=None):
+    _metrics[name] = {
+        "type": metric_type,
+        "help": help_text,
+        "labels": label_names,
+        "buckets": buckets,
+        "series": {},
+    }
+
+
+define_metric(
+    "eli_http_request_duration_seconds", "histogram",
+    "Time to build each response, by endpoint.",
+    ("endpoint", "method", "status"), REQUEST_BUCKETS,
+)
+define_metric(
+    "eli_db_queries_per_request", "histogram",
+    "SQL statements run while handling one request.",
+    ("endpoint",), QUERY_COUNT_BUCKETS,
+)
+define_metric(
+    "eli_db_time_per_request_seconds", "histogram",
+    "Total SQL time while handling one request.",
+    ("endpoint",), REQUEST_BUCKETS,
+)
+define_metric(
+    "eli_db_query_duration_seconds", "histogram",
+    "Duration of each SQL statement.",
+    ("endpoint",), QUERY_BUCKETS,
+)
+define_metric(
+    "eli_db_slow_queries_total", "counter",
+    "Statements slower than ELI_SLOW_QUERY_MS.",
+    ("endpoint",),
+)
+
+
+def observe(name, labels, value):
+    metric = _metrics[name]
+    buckets = metric["buckets"]
+
+    with _metrics_lock:
+        series = metric["series"].get(labels)
+        if series is None:
+            # Per-bucket (not cumulative) counts, then sum and count
+            series = metric["series"][labels] = [0] * (len(buckets) + 1) + [0.0, 0]
+        series[bisect_left(buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+
+def increment(name, labels, amount=1):
+    metric = _metrics[name]
+    with _metrics_lock:
+        metric["series"][labels] = metric["series"].get(labels, 0) + amount
+
+
+def escape_label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label_value(value)}"' for name, value in pairs) + "}"
+
+
+def render_metrics():
+    # Prometheus text exposition format 0.0.4
+    lines = []
+
+    with _metrics_lock:
+        for name, metric in _metrics.items():
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+
+            for labels, values in sorted(metric["series"].items()):
+                if metric["type"] == "counter":
+                    lines.append(f"{name}{format_labels(metric['labels'], labels)} {values}")
+                    continue
+
+                cumulative = 0
+                for bound, count in zip(metric["buckets"] + ("+Inf",), values):
+                    cumulative += count
+                    le = (("le", bound),)
+                    lines.append(
+                        f"{name}_bucket{format_labels(metric['labels'], labels, le)} {cumulative}"
+                    )
+                label_text = format_labels(metric["labels"], labels)
+                lines.append(f"{name}_sum{label_text} {values[-2]:.6f}")
+                lines.append(f"{name}_count{label_text} {values[-1]}")
+
+    return "\n".join(lines) + "\n"
+
+
+def current_endpoint():
+    if has_request_context():
+        return request.endpoint or "unmatched"
+    return NO_ENDPOINT
+
+
+def explain_query_plan(conn, statement, parameters):
+    # Raw DBAPI cursor, so this EXPLAIN doesn't go through the hooks again
+    cursor = conn.connection.driver_connection.cursor()
+    try:
+        rows = cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    finally:
+        cursor.close()
+    return "\n".join(f"  {row[-1]}" for row in rows)
+
+
+def init_metrics(app):
+    # Per-request timing and query counts
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_start = time.perf_counter()
+        g.query_count = 0
+        g.query_seconds = 0.0
+
+    @app.after_request
+    def record_request_metrics(response):
+        start = g.pop("metrics_start", None)
+        if start is None:
+            return response
+
+        # Streamed bodies (exports, live events) count up to the first byte
+        endpoint = request.endpoint or "unmatched"
+        observe(
+            "eli_http_request_duration_seconds",
+            (endpoint, request.method, str(response.status_code)),
+            time.perf_counter() - start,
+        )
+        observe("eli_db_queries_per_request", (endpoint,), g.query_count)
+        observe("eli_db_time_per_request_seconds", (endpoint,), g.query_seconds)
+
+        return response
+
+    # Per-statement timing
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        endpoint = current_endpoint()
+
+        observe("eli_db_query_duration_seconds", (endpoint,), elapsed)
+        if has_request_context() and "query_count" in g:
+            g.query_count += 1
+            g.query_seconds += elapsed
+
+        if SLOW_QUERY_MS is not None and elapsed * 1000 >= SLOW_QUERY_MS:
+            increment("eli_db_slow_queries_total", (endpoint,))
+            plan = ""
+            if not executemany and statement.lstrip().upper().startswith(EXPLAINABLE):
+                try:
+                    plan = explain_query_plan(conn, statement, parameters)
+                except Exception as e:  # a bad plan must never fail the query itself
+                    plan = f"  (no plan: {e})"
+            slow_query_log.warning(
+                "%.1f ms in %s: %s\n%s", elapsed * 1000, endpoint, statement, plan
+            )
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(db.engine, "after_cursor_execute", after_cursor_execute)
+
+    # Prometheus scrape target
+    @app.get("/metrics")
+    def metrics():
+        return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
@@ -5,8 +5,32 @@ from sqlalchemy import Enum
 db = SQLAlchemy()
 
 
+def session_span(day, start_time, end_time):
+    """
+    Full start/end datetimes and whole minutes for a feed or sleep session.
+
+    Sessions are logged as a date plus clock times, so an end time at or
+    before the start time means the session ran past midnight.
+    """
+    start_dt = datetime.combine(day, start_time)
+
+    if end_time is None:
+        return start_dt, None, None
+
+    end_dt = datetime.combine(day, end_time)
+
+    if end_dt <= start_dt:
+        end_dt += timedelta(days=1)
+
+    duration_min = int((end_dt - start_dt).total_seconds() // 60)
+
+    return start_dt, end_dt, duration_min
+
+
 class Diaper(db.Model):
     __tablename__ = "diapers"
+    # Ids are never reused, so they stay unique across the archive file too
+    __table_args__ = {"sqlite_autoincrement": True}
     
     id = db.Column(db.Integer, primary_key=True)
     dt = db.Column(db.DateTime, nullable=False, index=True)
@@ -22,16 +46,37 @@ class Diaper(db.Model):
 
 class Feed(db.Model):
     __tablename__ = "feed"
+    __table_args__ = (
+        # Matches list order so "See more" can seek instead of scan;
+        # unique so two caregivers can never both log the same feed number
+        db.Index("ix_feed_date_feed_num", "date", "feed_num", unique=True),
+        # Only running feeds, so the dashboard finds them without a scan
+        db.Index("ix_feed_active", "start_dt", sqlite_where=db.text("end_time IS NULL")),
+        # Ids are never reused, so they stay unique across the archive file too
+        {"sqlite_autoincrement": True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     date = db.Column(db.Date, nullable=False)
     feed_num = db.Column(db.Integer, autoincrement=True)
     start_time = db.Column(db.Time, nullable=False)
     end_time = db.Column(db.Time, nullable=True)
+    start_dt = db.Column(db.DateTime, nullable=True, index=True)
+    end_dt = db.Column(db.DateTime, nullable=True)
+    feed_duration_min = db.Column(db.Integer, nullable=True)
     feed_vol_ml = db.Column(db.Integer, nullable=True)
     feed_rate = db.Column(db.Integer, nullable=True)
     notes = db.Column(db.Text)
 
+    def set_times(self, day, start_time, end_time):
+        # Keep the stored datetimes and duration in step with the form fields
+        self.date = day
+        self.start_time = start_time
+        self.end_time = end_time
+        self.start_dt, self.end_dt, self.feed_duration_min = session_span(
+            day, start_time, end_time
+        )
+
     @property
     def status(self):
         if self.end_time is None:
@@ -42,20 +87,12 @@ class Feed(db.Model):
     
     @property
     def duration_min(self):
-        if self.end_time is None:
-            return None
-
-        start_dt = datetime.combine(self.date, self.start_time)
-        end_dt = datetime.combine(self.date, self.end_time)
-
-        # Handle feed crossing midnight
-        if end_dt <= start_dt:
-            end_dt += timedelta(days=1)
-
-        return int((end_dt - start_dt).total_seconds() // 60)
+        return self.feed_duration_min
 
 class Medication(db.Model):
     __tablename__ = "medication"
+    # Ids are never reused, so they stay unique across the archive file too
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = db.Column(db.Integer, primary_key=True)
     dt = db.Column(db.DateTime, nullable=False, index=True)
@@ -66,14 +103,33 @@ class Medication(db.Model):
 
 class Sleep(db.Model):
     __tablename__ = "sleep"
+    __table_args__ = (
+        # Matches list order so "See more" can seek instead of scan
+        db.Index("ix_sleep_date_start_time", "date", "start_time"),
+        # Only running sleeps, so the dashboard finds them without a scan
+        db.Index("ix_sleep_active", "start_dt", sqlite_where=db.text("end_time IS NULL")),
+        # Ids are never reused, so they stay unique across the archive file too
+        {"sqlite_autoincrement": True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     date = db.Column(db.Date, nullable=False)
     start_time = db.Column(db.Time, nullable=False)
     end_time = db.Column(db.Time, nullable=True)
+    start_dt = db.Column(db.DateTime, nullable=True, index=True)
+    end_dt = db.Column(db.DateTime, nullable=True)
     sleep_duration_min = db.Column(db.Integer, nullable=True)
     notes = db.Column(db.Text)
 
+    def set_times(self, day, start_time, end_time):
+        # Keep the stored datetimes and duration in step with the form fields
+        self.date = day
+        self.start_time = start_time
+        self.end_time = end_time
+        self.start_dt, self.end_dt, self.sleep_duration_min = session_span(
+            day, start_time, end_time
+        )
+
     @property
     def status(self):
         if self.end_time is None:
@@ -82,6 +138,8 @@ class Sleep(db.Model):
 
 class Vomit(db.Model):
     __tablename__ = "vomit"
+    # Ids are never reused, so they stay unique across the archive file too
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = db.Column(db.Integer, primary_key=True)
     dt = db.Column(db.DateTime, nullable=False, index=True)
@@ -92,4 +150,42 @@ class Vomit(db.Model):
     feed_rate = db.Column(db.Integer, nullable=True)
     vomit_reason = db.Column(db.Text)
 
+class DailyStat(db.Model):
+    __tablename__ = "daily_stats"
+
+    # Per-day counters, kept in step with the log tables by daily_stats.py
+    date = db.Column(db.Date, primary_key=True)
+    wet_diapers = db.Column(db.Integer, nullable=False, default=0)
+    bm_diapers = db.Column(db.Integer, nullable=False, default=0)
+    feeds = db.Column(db.Integer, nullable=False, default=0)
+    feed_ml = db.Column(db.Integer, nullable=False, default=0)
+    sleep_min = db.Column(db.Integer, nullable=False, default=0)
+    vomits = db.Column(db.Integer, nullable=False, default=0)
+    med_doses = db.Column(db.Integer, nullable=False, default=0)
+
+class TableVersion(db.Model):
+    __tablename__ = "table_versions"
+
+    # Bumped whenever a flush writes to the table (see table_versions.py)
+    table_name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False)  # UTC
+
+class IngestKey(db.Model):
+    __tablename__ = "ingest_keys"
+
+    # Idempotency keys of entries replayed by offline clients, so a retried
+    # batch never inserts the same entry twice
+    key = db.Column(db.String(64), primary_key=True)
+    log_name = db.Column(db.String(20), nullable=False)
+    row_id = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)  # UTC
+
+class SchemaVersion(db.Model):
+    __tablename__ = "schema_version"
+
+    # One row per migration applied (see schema.py); startup only reads the max
+    version = db.Column(db.Integer, primary_key=True)
+    applied_at = db.Column(db.DateTime, nullable=False)  # UTC
+
 # TODO: Implement weekly tasks tracker model (trach change, G-tube balloon check, etc.)
\ No newline at end of file
@@ -0,0 +1,78 @@
+from datetime import timezone
+from functools import wraps
+import hashlib
+
+from flask import make_response, request, session
+
+from table_versions import read_table_versions, utc_now
+
+# Changes on every deploy/restart so new templates are never served as 304
+BOOT_TIME = utc_now().replace(microsecond=0)
+
+
+def conditional_get(*table_names, per_minute=False):
+    """
+    Answer GETs with ETag/Last-Modified built from table change versions.
+
+    A matching If-None-Match (or If-Modified-Since) gets a 304 after one
+    small table_versions query, before the view, ORM or templates run.
+    per_minute views (e.g. "5 minutes ago") also change once a minute.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            # Pages carrying a flash toast are one-offs; render normally
+            if "_flashes" in session:
+                return view(*args, **kwargs)
+
+            versions = read_table_versions(table_names)
+
+            last_modified = BOOT_TIME
+            for _, updated_at in versions.values():
+                if updated_at and updated_at > last_modified:
+                    last_modified = updated_at
+
+            if per_minute:
+                this_minute = utc_now().replace(second=0, microsecond=0)
+                last_modified = max(last_modified, this_minute)
+
+            last_modified = last_modified.replace(microsecond=0)
+            etag = build_etag(versions, last_modified)
+
+            if is_not_modified(etag, last_modified):
+                response = make_response("", 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+
+            response.set_etag(etag)
+            response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+
+            # Always revalidate; the 304 path is what keeps it cheap
+            response.cache_control.no_cache = True
+            response.cache_control.private = True
+
+            return response
+
+        return wrapped
+
+    return decorator
+
+
+def build_etag(versions, last_modified):
+    key = "|".join(
+        [request.full_path, last_modified.isoformat()]
+        + [f"{name}:{version}" for name, (version, _) in sorted(versions.items())]
+    )
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def is_not_modified(etag, last_modified):
+    # If-None-Match wins over If-Modified-Since when both are sent
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+
+    since = request.if_modified_since
+    if since is not None:
+        return last_modified <= since.replace(tzinfo=None)
+
+    return False
@@ -0,0 +1,52 @@
+from datetime import date, datetime, time, timedelta
+
+from flask import abort
+
+
+def parse_date_range(args):
+    """
+    Inclusive (from, to) dates from ?from=YYYY-MM-DD&to=YYYY-MM-DD.
+
+    Either end may be missing (None); a malformed date is a 400.
+    """
+    bounds = []
+    for name in ("from", "to"):
+        value = (args.get(name) or "").strip()
+        if not value:
+            bounds.append(None)
+            continue
+        try:
+            bounds.append(date.fromisoformat(value))
+        except ValueError:
+            abort(400)
+
+    start, end = bounds
+
+    # Picked backwards; treat it as the same span
+    if start and end and start > end:
+        start, end = end, start
+
+    return start, end
+
+
+def filter_date_range(query, col, start, end):
+    # Half-open bounds on the indexed column itself, so SQLite can seek the index
+    if col.type.python_type is datetime:
+        if start:
+            query = query.filter(col >= datetime.combine(start, time.min))
+        if end:
+            query = query.filter(col < datetime.combine(end + timedelta(days=1), time.min))
+    else:
+        if start:
+            query = query.filter(col >= start)
+        if end:
+            query = query.filter(col <= end)
+
+    return query
+
+
+def count_in_range(queries, start, end):
+    # Total entries in the chosen range across hot and archive; None when unfiltered
+    if start is None and end is None:
+        return None
+    return sum(query.order_by(None).count() for query in queries)
@@ -2,29 +2,43 @@ from datetime import datetime
 
 from flask import flash, redirect, render_template, request, url_for
 
+from daily_stats import record_daily_stats, retract_daily_stats
 from models import db, Diaper
+from routes.conditional import conditional_get
+from routes.pagination import log_list_page
+
+
+def parse_diaper_form(form):
+    """Validated Diaper fields from a submitted form."""
+    # Raw values from form
+    dt_str = form["dt"]
+    wet_diaper_size = form["wet_diaper_size"] or None
+    bm_diaper_size = form["bm_diaper_size"] or None
+    notes = (form.get("notes") or "").strip() or None
+
+    # Convert date string to datetime
+    dt = datetime.fromisoformat(dt_str)
+
+    # Sizes must be one of the Enum values
+    sizes = Diaper.wet_diaper_size.type.enums
+    for size in (wet_diaper_size, bm_diaper_size):
+        if size is not None and size not in sizes:
+            raise ValueError(f"Diaper size must be one of {', '.join(sizes)}")
+
+    return {
+        "dt": dt,
+        "wet_diaper_size": wet_diaper_size,
+        "bm_diaper_size": bm_diaper_size,
+        "notes": notes,
+    }
+
 
 def init_diaper_routes(app):
     # Show history of diapers
     @app.get("/diaper")
+    @conditional_get("diapers")
     def diaper_list():
-        PER_PAGE = 5
-        page = request.args.get("page", default=0, type=int)
-        offset = page * PER_PAGE
-
-        q = Diaper.query.order_by(Diaper.dt.desc())
-        rows = q.offset(offset).limit(PER_PAGE + 1).all()
-
-        has_more = len(rows) > PER_PAGE
-        rows = rows[:PER_PAGE]
-
-        return render_template(
-            "diaper_list.html",
-            rows=rows,
-            page=page,
-            has_more=has_more,
-            page_key="diaper"
-        )
+        return log_list_page("diaper", Diaper, "dt", ("dt", "id"))
 
     # New diaper entry form
     @app.get("/diaper/new")
@@ -37,23 +51,12 @@ def init_diaper_routes(app):
     # Create new diaper entry
     @app.post("/diaper/new")
     def diaper_create():
-        # Raw values from form
-        dt_str = request.form["dt"]
-        wet_diaper_size = request.form["wet_diaper_size"] or None
-        bm_diaper_size = request.form["bm_diaper_size"] or None
-        notes = request.form.get("notes").strip() or None
-
-        # Convert date string to datetime
-        dt = datetime.fromisoformat(dt_str)
-        
-        row = Diaper(
-            dt=dt,
-            wet_diaper_size=wet_diaper_size,
-            bm_diaper_size=bm_diaper_size,
-            notes=notes
-        )
+        fields = parse_diaper_form(request.form)
+
+        row = Diaper(**fields)
 
         db.session.add(row)
+        record_daily_stats(row)
         db.session.commit()
 
         flash("Saved diaper entry.", "success")
@@ -73,20 +76,17 @@ def init_diaper_routes(app):
     def diaper_update(diaper_id):
         row = Diaper.query.get_or_404(diaper_id)
 
-        # Raw values from form
-        raw_dt = request.form["dt"]
-        wet_diaper_size = request.form["wet_diaper_size"] or None
-        bm_diaper_size = request.form["bm_diaper_size"] or None
-        notes = request.form.get("notes").strip() or None
+        fields = parse_diaper_form(request.form)
 
-        # Convert date string to datetime
-        dt = datetime.fromisoformat(raw_dt)
+        # Take old values out of the daily counters
+        retract_daily_stats(row)
 
         # Apply updates
-        row.dt = dt
-        row.wet_diaper_size = wet_diaper_size
-        row.bm_diaper_size = bm_diaper_size
-        row.notes = notes
+        row.dt = fields["dt"]
+        row.wet_diaper_size = fields["wet_diaper_size"]
+        row.bm_diaper_size = fields["bm_diaper_size"]
+        row.notes = fields["notes"]
+        record_daily_stats(row)
 
         db.session.commit()
 
@@ -97,6 +97,7 @@ def init_diaper_routes(app):
     @app.post("/diaper/<int:diaper_id>/delete")
     def diaper_delete(diaper_id):
         diaper = Diaper.query.get_or_404(diaper_id)  # Find entry
+        retract_daily_stats(diaper)                  # Update daily counters
         db.session.delete(diaper)                    # Mark for delete
         db.session.commit()                          # Save change
         flash("Diaper entry deleted.", "success")    # Notify user
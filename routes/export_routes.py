@@ -0,0 +1,164 @@
+import csv
+import heapq
+import io
+import json
+import zipfile
+from datetime import date, datetime, time
+from itertools import islice
+
+from flask import Response, abort, stream_with_context
+
+from archive import log_tables
+from models import db, Diaper, Feed, Medication, Sleep, Vomit
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 500
+
+# Export name -> (model, chronological sort key)
+EXPORT_LOGS = {
+    "diaper": (Diaper, (Diaper.dt, Diaper.id)),
+    "feed": (Feed, (Feed.date, Feed.feed_num, Feed.id)),
+    "sleep": (Sleep, (Sleep.date, Sleep.start_time, Sleep.id)),
+    "medication": (Medication, (Medication.dt, Medication.id)),
+    "vomit": (Vomit, (Vomit.dt, Vomit.id)),
+}
+
+
+class _EchoWriter:
+    # csv.writer target that hands each formatted line straight back
+    def write(self, line):
+        return line
+
+
+class _ZipStream(io.RawIOBase):
+    # Write-only sink for zipfile; bytes are drained and yielded as they come
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def export_value(value):
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    return value
+
+
+def stream_rows(log_name):
+    """
+    Yield lists of rows for one log, oldest first, batch by batch.
+
+    yield_per keeps a server-side cursor open per table (hot and archive),
+    and the two already-ordered streams are merged as they're read, so
+    memory stays flat no matter how much history there is.
+    """
+    model, order_cols = EXPORT_LOGS[log_name]
+    positions = [model.__table__.columns.keys().index(col.key) for col in order_cols]
+
+    def sorted_rows(table):
+        stmt = (
+            db.select(*table.columns)
+            .order_by(*[table.c[col.key] for col in order_cols])
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        for batch in db.session.execute(stmt).partitions():
+            yield from batch
+
+    def key(row):
+        # NULLs first, as SQLite orders them
+        return tuple((row[i] is not None, row[i]) for i in positions)
+
+    merged = heapq.merge(*[sorted_rows(table) for table in log_tables(model)], key=key)
+
+    while True:
+        batch = list(islice(merged, EXPORT_BATCH_SIZE))
+        if not batch:
+            return
+        yield [[export_value(value) for value in row] for row in batch]
+
+
+def csv_chunks(log_name):
+    model, _ = EXPORT_LOGS[log_name]
+    writer = csv.writer(_EchoWriter())
+
+    # Header goes out before the query runs
+    yield writer.writerow(model.__table__.columns.keys())
+
+    for batch in stream_rows(log_name):
+        yield "".join(
+            writer.writerow(["" if value is None else value for value in row])
+            for row in batch
+        )
+
+
+def ndjson_chunks(log_name):
+    model, _ = EXPORT_LOGS[log_name]
+    keys = model.__table__.columns.keys()
+
+    for batch in stream_rows(log_name):
+        yield "".join(json.dumps(dict(zip(keys, row))) + "\n" for row in batch)
+
+
+EXPORT_FORMATS = {
+    "csv": (csv_chunks, "text/csv"),
+    "ndjson": (ndjson_chunks, "application/x-ndjson"),
+}
+
+
+def archive_chunks():
+    sink = _ZipStream()
+
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for log_name in EXPORT_LOGS:
+            with archive.open(f"{log_name}.csv", "w") as entry:
+                for chunk in csv_chunks(log_name):
+                    entry.write(chunk.encode())
+
+                    data = sink.drain()
+                    if data:
+                        yield data
+
+    # Central directory is written on close
+    yield sink.drain()
+
+
+def attachment_headers(filename):
+    return {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+
+def init_export_routes(app):
+    # Download one log as CSV or NDJSON
+    @app.get("/export/<log_name>.<any(csv, ndjson):fmt>")
+    def export_log(log_name, fmt):
+        if log_name not in EXPORT_LOGS:
+            abort(404)
+
+        chunks, mimetype = EXPORT_FORMATS[fmt]
+        filename = f"eli_care_log_{log_name}_{date.today().isoformat()}.{fmt}"
+
+        return Response(
+            stream_with_context(chunks(log_name)),
+            mimetype=mimetype,
+            headers=attachment_headers(filename),
+        )
+
+    # Download every log as CSV files in one zip
+    @app.get("/export/all.zip")
+    def export_all():
+        filename = f"eli_care_log_{date.today().isoformat()}.zip"
+
+        return Response(
+            stream_with_context(archive_chunks()),
+            mimetype="application/zip",
+            headers=attachment_headers(filename),
+        )
@@ -1,32 +1,84 @@
 from datetime import date, time
 
 from flask import flash, redirect, render_template, request, url_for
-from sqlalchemy import func
+from sqlalchemy import func, union_all
+from sqlalchemy.exc import IntegrityError
 
+from active_sessions import stop_session
+from archive import archived, log_tables
+from daily_stats import record_daily_stats, retract_daily_stats
 from models import db, Feed
+from routes.conditional import conditional_get
+from routes.pagination import log_list_page
+
+
+def parse_feed_form(form):
+    """Validated Feed fields from a submitted form."""
+    # Raw values from form
+    feed_date_str = form["date"]
+    feed_num_str = (form.get("feed_num") or "").strip()
+    start_time_str = form["start_time"]
+    end_time_str = form["end_time"]
+    feed_vol_ml_str = form["feed_vol_ml"].strip()
+    feed_rate_str = form["feed_rate"].strip()
+    notes = (form.get("notes") or "").strip() or None
+
+    # SQLite Date type must be Python date object for table
+    feed_date = date.fromisoformat(feed_date_str)
+
+    # Ensure inputs are stored as integers; a blank feed number is assigned on save
+    feed_num = int(feed_num_str) if feed_num_str else None
+    feed_vol_ml = int(feed_vol_ml_str) if feed_vol_ml_str else None
+    feed_rate = int(feed_rate_str) if feed_rate_str else None
+
+    # SQLite Time type must be Python time object for table
+    start_time = time.fromisoformat(start_time_str)
+    end_time = time.fromisoformat(end_time_str) if end_time_str else None
+
+    if feed_num is not None and feed_num < 1:
+        raise ValueError("Feed number must be 1 or more")
+
+    return {
+        "date": feed_date,
+        "feed_num": feed_num,
+        "start_time": start_time,
+        "end_time": end_time,
+        "feed_vol_ml": feed_vol_ml,
+        "feed_rate": feed_rate,
+        "notes": notes,
+    }
+
+
+def next_feed_num(day):
+    """
+    The next feed number for `day`, as an SQL expression.
+
+    Assigned to Feed.feed_num it runs inside the row's own INSERT, which
+    holds SQLite's write lock, so two caregivers saving at once get
+    consecutive numbers. The unique (date, feed_num) index backs it up.
+    Archived feeds count too, so a backdated feed never reuses their numbers.
+    """
+    numbers = union_all(*[
+        db.select(table.c.feed_num).where(table.c.date == day)
+        for table in log_tables(Feed)
+    ]).subquery()
+    return db.select(func.coalesce(func.max(numbers.c.feed_num), 0) + 1).scalar_subquery()
+
+
+def feed_num_archived(day, feed_num):
+    # The hot table's unique index can't see numbers already in the archive
+    entity = archived(Feed)
+    return db.session.query(
+        db.session.query(entity).filter(entity.date == day, entity.feed_num == feed_num).exists()
+    ).scalar()
 
 
 def init_feed_routes(app):
     # Show history of feeds
     @app.get("/feed")
+    @conditional_get("feed")
     def feed_list():
-        PER_PAGE = 5
-        page = request.args.get("page", default=0, type=int)
-        offset = page * PER_PAGE
-
-        q = Feed.query.order_by(Feed.date.desc(), Feed.feed_num.desc())
-        rows = q.offset(offset).limit(PER_PAGE + 1).all()
-
-        has_more = len(rows) > PER_PAGE
-        rows = rows[:PER_PAGE]
-
-        return render_template(
-            "feed_list.html",
-            rows=rows,
-            page=page,
-            has_more=has_more,
-            page_key="feed",
-        )
+        return log_list_page("feed", Feed, "date", ("date", "feed_num", "id"))
 
     # New feed entry form
     @app.get("/feed/new")
@@ -34,58 +86,32 @@ def init_feed_routes(app):
         # Pre-fill date field with today's date
         today = date.today().isoformat()
 
-        # Pre-fill feed number field with next feed number
-        last_feed_num = (db.session.query(func.max(Feed.feed_num))
-            .filter(Feed.date == today)
-            .scalar()
-        )
-        next_feed_num = (last_feed_num or 0) + 1
+        # Show the likely feed number; the real one is assigned on save
+        expected_feed_num = db.session.scalar(db.select(next_feed_num(today)))
 
         return render_template(
             "feed_new.html",
             today=today,
-            next_feed_num=next_feed_num,
+            expected_feed_num=expected_feed_num,
             page_key="feed",
         )
 
     # Create new feed entry
     @app.post("/feed/new")
     def feed_create():
-        # Raw values from form
-        feed_date_str = request.form["date"]
-        feed_num_str = request.form["feed_num"].strip()
-        start_time_str = request.form["start_time"]
-        end_time_str = request.form["end_time"]
-        feed_vol_ml_str = request.form["feed_vol_ml"].strip()
-        feed_rate_str = request.form["feed_rate"].strip()
-        notes = request.form.get("notes").strip() or None
-
-        # SQLite Date type must be Python date object for table
-        feed_date = date.fromisoformat(feed_date_str)
-
-        # Ensure inputs are stored as integers
-        feed_num = int(feed_num_str)
-        feed_vol_ml = int(feed_vol_ml_str) if feed_vol_ml_str else None
-        feed_rate = int(feed_rate_str) if feed_rate_str else None
-
-        # SQLite Time type must be Python time object for table
-        start_time = time.fromisoformat(start_time_str)
-        end_time = time.fromisoformat(end_time_str) if end_time_str else None
-
-        row = Feed(
-            date=feed_date,
-            feed_num=feed_num,
-            start_time=start_time,
-            end_time=end_time,
-            feed_vol_ml=feed_vol_ml,
-            feed_rate=feed_rate,
-            notes=notes
-        )
-        
+        fields = parse_feed_form(request.form)
+
+        row = Feed(**fields)
+        row.set_times(fields["date"], fields["start_time"], fields["end_time"])
+
+        # Never trust a number from the form; two open forms show the same one
+        row.feed_num = next_feed_num(row.date)
+
         db.session.add(row)
+        record_daily_stats(row)
         db.session.commit()
 
-        flash("Saved feed entry.", "success")
+        flash(f"Saved feed #{row.feed_num}.", "success")
         return redirect(url_for("feed_list"))
 
     # Edit feed entry form
@@ -103,45 +129,50 @@ def init_feed_routes(app):
     def feed_update(feed_id):
         row = Feed.query.get_or_404(feed_id)
 
-        # Raw values from form
-        feed_date_str = request.form["date"]
-        feed_num_str = request.form["feed_num"].strip()
-        start_time_str = request.form["start_time"]
-        end_time_str = request.form["end_time"]
-        feed_vol_ml_str = request.form["feed_vol_ml"].strip()
-        feed_rate_str = request.form["feed_rate"].strip()
-        notes = request.form.get("notes").strip() or None
-
-        # SQLite Date type must be Python date object for table
-        feed_date = date.fromisoformat(feed_date_str)
-
-        # Ensure inputs are stored as integers
-        feed_num = int(feed_num_str)
-        feed_vol_ml = int(feed_vol_ml_str) if feed_vol_ml_str else None
-        feed_rate = int(feed_rate_str) if feed_rate_str else None
-
-        # SQLite Time type must be Python time object for table
-        start_time = time.fromisoformat(start_time_str)
-        end_time = time.fromisoformat(end_time_str) if end_time_str else None
-
-        # Apply updates
-        row.date = feed_date
-        row.feed_num = feed_num
-        row.start_time = start_time
-        row.end_time = end_time    
-        row.feed_vol_ml = feed_vol_ml
-        row.feed_rate = feed_rate
-        row.notes = notes
+        fields = parse_feed_form(request.form)
+        feed_num = fields["feed_num"] or row.feed_num
 
-        db.session.commit()
+        if feed_num_archived(fields["date"], feed_num):
+            flash(f"Feed #{feed_num} already exists on {fields['date']}.")
+            return redirect(url_for("feed_edit", feed_id=feed_id))
+
+        try:
+            # Take old values out of the daily counters
+            retract_daily_stats(row)
+
+            # Apply updates
+            row.set_times(fields["date"], fields["start_time"], fields["end_time"])
+            row.feed_num = feed_num
+            row.feed_vol_ml = fields["feed_vol_ml"]
+            row.feed_rate = fields["feed_rate"]
+            row.notes = fields["notes"]
+            record_daily_stats(row)
+
+            db.session.commit()
+        except IntegrityError:
+            # Unique (date, feed_num): that day already has this number
+            db.session.rollback()
+            flash(f"Feed #{feed_num} already exists on {fields['date']}.")
+            return redirect(url_for("feed_edit", feed_id=feed_id))
 
         flash("Feed entry updated.")
         return redirect(url_for("feed_list"))
 
+    # End a running feed now, without the edit form
+    @app.post("/feed/<int:feed_id>/stop")
+    def feed_stop(feed_id):
+        stopped = stop_session(Feed, feed_id)
+        if stopped is None:
+            flash("That feed has already ended.")
+        else:
+            flash(f"Feed stopped after {stopped[1]} min. Add the volume when you can.", "success")
+        return redirect(url_for("dashboard"))
+
     # Delete feed entry
     @app.post("/feed/<int:feed_id>/delete")
     def feed_delete(feed_id):
         row = Feed.query.get_or_404(feed_id)     # Find entry
+        retract_daily_stats(row)                 # Update daily counters
         db.session.delete(row)                   # Mark for delete
         db.session.commit()                      # Save change
         flash("Feed entry deleted.", "success")  # Notify user
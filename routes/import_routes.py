@@ -0,0 +1,64 @@
+import csv
+import io
+
+from flask import flash, render_template, request
+
+from bulk_import import IMPORT_LOGS, guess_format, import_records, read_records
+
+# Cap how many row errors are shown on the page
+MAX_ERRORS_SHOWN = 100
+
+
+def init_import_routes(app):
+    # Bulk import form
+    @app.get("/import")
+    def import_form():
+        return render_template(
+            "import.html",
+            log_names=list(IMPORT_LOGS),
+            page_key="dashboard",
+        )
+
+    # Bulk import a CSV/NDJSON upload into one log
+    @app.post("/import")
+    def import_upload():
+        log_name = request.form["log_name"]
+        upload = request.files.get("file")
+
+        if log_name not in IMPORT_LOGS or not upload or not upload.filename:
+            flash("Choose a log and a file to import.")
+            return render_template(
+                "import.html",
+                log_names=list(IMPORT_LOGS),
+                page_key="dashboard",
+            ), 400
+
+        fmt = request.form.get("fmt") or guess_format(upload.filename) or "csv"
+
+        # utf-8-sig drops the BOM spreadsheet apps like to add
+        stream = io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline="")
+        try:
+            result = import_records(log_name, read_records(stream, fmt))
+        except (UnicodeDecodeError, csv.Error):
+            flash("Could not read that file as UTF-8 CSV/NDJSON.")
+            return render_template(
+                "import.html",
+                log_names=list(IMPORT_LOGS),
+                page_key="dashboard",
+            ), 400
+
+        flash(
+            f"Imported {result['inserted']} {log_name} entries "
+            f"({len(result['errors'])} rows skipped).",
+            "success",
+        )
+
+        return render_template(
+            "import.html",
+            log_names=list(IMPORT_LOGS),
+            log_name=log_name,
+            inserted=result["inserted"],
+            errors=result["errors"][:MAX_ERRORS_SHOWN],
+            error_count=len(result["errors"]),
+            page_key="dashboard",
+        )
@@ -0,0 +1,126 @@
+import json
+import os
+import threading
+import time
+
+from flask import Response, current_app, jsonify, request
+
+from live_updates import LIVE_TABLES, last_change_id, start_change_poller, wait_for_changes
+from table_versions import read_table_versions
+
+# Endpoints that patch themselves in place -> tables they show
+LIVE_PAGES = {
+    "dashboard": ("diapers", "feed", "sleep"),
+    "diaper_list": ("diapers",),
+    "feed_list": ("feed",),
+    "sleep_list": ("sleep",),
+    "medication_list": ("medication",),
+    "vomit_list": ("vomit",),
+    "timeline": ("diapers", "feed", "sleep", "medication", "vomit"),
+}
+
+# Fan-out is one in-memory condition per process, fed by commits here and
+# by one poller thread reading table_versions for other processes: an idle
+# page costs no queries and no CPU. It does park one gthread server thread
+# until its next event (there's no async worker in the requirements), so
+# streams are capped at half the pool by default and ordinary requests
+# always have threads left. Pages past the cap get a 503 and fall back to
+# polling /live/versions, one indexed read every few seconds
+LIVE_MAX_STREAMS = int(
+    os.environ.get("ELI_LIVE_MAX_STREAMS", int(os.environ.get("ELI_THREADS", 32)) // 2)
+)
+
+# Comment line every so often so proxies and phones keep the stream open
+LIVE_HEARTBEAT_SECONDS = 15
+
+# Streams end after a while and the browser reconnects with Last-Event-ID,
+# so deploys and worker restarts never wait on idle pages
+LIVE_STREAM_SECONDS = 300
+
+_open_streams = 0
+_open_streams_lock = threading.Lock()
+
+
+def live_page_tables():
+    # Template helper: tables to watch on this page ("" = not a live page)
+    return ",".join(LIVE_PAGES.get(request.endpoint, ()))
+
+
+def sse_event(name, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {name}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+def stream_changes(after_id):
+    yield "retry: 3000\n\n"
+
+    deadline = time.monotonic() + LIVE_STREAM_SECONDS
+    while time.monotonic() < deadline:
+        changes, reset = wait_for_changes(after_id, LIVE_HEARTBEAT_SECONDS)
+
+        if reset:
+            after_id = last_change_id()
+            yield sse_event("reset", {}, after_id)
+            continue
+
+        if not changes:
+            yield ": keepalive\n\n"
+            continue
+
+        for change_id, change in changes:
+            yield sse_event("change", change, change_id)
+        after_id = changes[-1][0]
+
+
+def close_stream():
+    global _open_streams
+
+    with _open_streams_lock:
+        _open_streams -= 1
+
+
+def init_live_routes(app):
+    app.add_template_global(live_page_tables)
+    app.add_template_global(last_change_id)
+
+    # Server-Sent Events: {"table", "id", "action"} for every committed log write
+    @app.get("/live/events")
+    def live_events():
+        global _open_streams
+
+        # Reconnects send Last-Event-ID; first connects send the id the page was rendered at
+        after_id = request.headers.get("Last-Event-ID") or request.args.get("since")
+        try:
+            after_id = int(after_id)
+        except (TypeError, ValueError):
+            after_id = last_change_id()
+
+        with _open_streams_lock:
+            if _open_streams >= LIVE_MAX_STREAMS:
+                return Response("Too many live pages open", 503, headers={"Retry-After": "30"})
+            _open_streams += 1
+
+        start_change_poller(current_app._get_current_object())
+
+        response = Response(stream_changes(after_id), mimetype="text/event-stream")
+        response.call_on_close(close_stream)
+        response.cache_control.no_cache = True
+
+        # Stop nginx-style proxies from buffering the stream
+        response.headers["X-Accel-Buffering"] = "no"
+
+        return response
+
+    # Fallback for pages refused a stream: {table: version}, polled by live.js
+    @app.get("/live/versions")
+    def live_versions():
+        tables = [name for name in request.args.get("tables", "").split(",") if name in LIVE_TABLES]
+        versions = read_table_versions(tables)
+
+        response = jsonify({name: version for name, (version, _) in versions.items()})
+        response.cache_control.no_store = True
+        return response
@@ -2,29 +2,44 @@ from datetime import datetime
 
 from flask import flash, redirect, render_template, request, url_for
 
+from daily_stats import record_daily_stats, retract_daily_stats
 from models import db, Medication
+from routes.conditional import conditional_get
+from routes.pagination import log_list_page
+
+
+def parse_medication_form(form):
+    """Validated Medication fields from a submitted form."""
+    # Raw values from form
+    dt_str = form["dt"]
+    med_name = form["med_name"]
+    dosage_ml = form["dosage_ml"]
+    initials = form["initials"].strip().upper()
+    notes = (form.get("notes") or "").strip() or None
+
+    # Convert date string to datetime
+    dt = datetime.fromisoformat(dt_str)
+
+    # Dosage is a Float column; initials fit String(2)
+    dosage_ml = float(dosage_ml)
+    if not initials or len(initials) > 2:
+        raise ValueError("Initials must be 1-2 characters")
+
+    return {
+        "dt": dt,
+        "med_name": med_name,
+        "dosage_ml": dosage_ml,
+        "initials": initials,
+        "notes": notes,
+    }
+
 
 def init_medication_routes(app):
     # Show history of medications
     @app.get("/medication")
+    @conditional_get("medication")
     def medication_list():
-        PER_PAGE = 5
-        page = request.args.get("page", default=0, type=int)
-        offset = page * PER_PAGE
-
-        q = Medication.query.order_by(Medication.dt.desc())
-        rows = q.offset(offset).limit(PER_PAGE + 1).all()
-
-        has_more = len(rows) > PER_PAGE
-        rows = rows[:PER_PAGE]
-
-        return render_template(
-            "medication_list.html",
-            rows=rows,
-            page=page,
-            has_more=has_more,
-            page_key="medication",
-        )
+        return log_list_page("medication", Medication, "dt", ("dt", "id"))
     
     # New medication entry form
     @app.get("/medication/new")
@@ -37,25 +52,12 @@ def init_medication_routes(app):
     # Create new medication entry
     @app.post("/medication/new")
     def medication_create():
-        # Raw values from form
-        dt_str = request.form["dt"]
-        med_name = request.form["med_name"]
-        dosage_ml = request.form["dosage_ml"]
-        initials = request.form["initials"].strip().upper()
-        notes = request.form.get("notes").strip() or None
-
-        # Convert date string to datetime
-        dt = datetime.fromisoformat(dt_str)
-        
-        row = Medication(
-            dt=dt,
-            med_name=med_name,
-            dosage_ml=dosage_ml,
-            initials=initials,
-            notes=notes
-        )
+        fields = parse_medication_form(request.form)
+
+        row = Medication(**fields)
 
         db.session.add(row)
+        record_daily_stats(row)
         db.session.commit()
 
         flash("Saved medication entry.", "success")
@@ -76,22 +78,18 @@ def init_medication_routes(app):
     def medication_update(medication_id):
         row = Medication.query.get_or_404(medication_id)
         
-        # Raw values from form
-        dt_str = request.form["dt"]
-        med_name = request.form["med_name"]
-        dosage_ml = request.form["dosage_ml"]
-        initials = request.form["initials"].strip().upper()
-        notes = request.form.get("notes").strip() or None
+        fields = parse_medication_form(request.form)
 
-        # Convert date string to datetime
-        dt = datetime.fromisoformat(dt_str)
+        # Take old values out of the daily counters
+        retract_daily_stats(row)
 
         # Apply updates
-        row.dt = dt
-        row.med_name = med_name
-        row.dosage_ml = dosage_ml
-        row.initials = initials
-        row.notes = notes
+        row.dt = fields["dt"]
+        row.med_name = fields["med_name"]
+        row.dosage_ml = fields["dosage_ml"]
+        row.initials = fields["initials"]
+        row.notes = fields["notes"]
+        record_daily_stats(row)
 
         db.session.commit()
 
@@ -102,6 +100,7 @@ def init_medication_routes(app):
     @app.post("/medication/<int:medication_id>/delete")
     def medication_delete(medication_id):
         medication = Medication.query.get_or_404(medication_id)  # Find entry
+        retract_daily_stats(medication)                          # Update daily counters
         db.session.delete(medication)                            # Mark for delete
         db.session.commit()                                      # Save change
         flash("Medication entry deleted.", "success")            # Notify user
@@ -0,0 +1,163 @@
+from collections import Counter, defaultdict
+import hashlib
+
+from flask import jsonify, make_response, render_template, request
+from sqlalchemy.exc import IntegrityError
+
+from assets import asset_paths, asset_url
+from bulk_import import IMPORT_LOGS, as_form
+from daily_stats import ROW_STATS, add_to_daily_stats
+from models import db, Feed, IngestKey
+from routes.feed_routes import next_feed_num
+from table_versions import utc_now
+from ui_themes import PAGE_THEMES
+
+# Most entries accepted in one replayed batch
+INGEST_MAX_ENTRIES = 500
+
+# Pages cached for offline use; list pages are refreshed on every online visit
+SHELL_PAGES = ["/", "/timeline"] + [
+    path
+    for log_name in IMPORT_LOGS
+    for path in (f"/{log_name}", f"/{log_name}/new")
+]
+
+# Static files the shell pages need
+SHELL_ASSETS = [
+    "vendor/bootstrap/bootstrap.min.css",
+    "css/base.css",
+    "js/offline.js",
+    "js/live.js",
+    "js/see_more.js",
+    "js/timers.js",
+    "fonts/pokemon_solid.ttf",
+    "icons/pokeball.svg",
+    "favicon.ico",
+]
+
+
+def shell_asset_urls():
+    # Vendored Nunito (CSS and woff2 files) only exists once vendor_assets.py has run
+    paths = SHELL_ASSETS + asset_paths("vendor/nunito/") + [
+        path
+        for page_key, theme in PAGE_THEMES.items()
+        for path in (f"css/themes/{page_key}.css", theme["icon"])
+    ]
+    return [asset_url(path) for path in paths]
+
+
+def init_offline_routes(app):
+    # Service worker; served from the root so its scope covers every page
+    @app.get("/sw.js")
+    def service_worker():
+        precache = SHELL_PAGES + shell_asset_urls()
+
+        # New asset hashes -> new cache name, so old copies get dropped
+        cache_version = hashlib.sha1("|".join(precache).encode()).hexdigest()[:10]
+
+        response = make_response(render_template(
+            "sw.js",
+            precache=precache,
+            cache_version=cache_version,
+            log_names=list(IMPORT_LOGS),
+            max_entries=INGEST_MAX_ENTRIES,
+        ))
+        response.mimetype = "text/javascript"
+        response.cache_control.no_cache = True
+        return response
+
+    # Replay entries queued while offline, all in one transaction
+    @app.post("/api/ingest")
+    def ingest_batch():
+        payload = request.get_json(silent=True)
+        entries = payload.get("entries") if isinstance(payload, dict) else None
+
+        if not isinstance(entries, list) or len(entries) > INGEST_MAX_ENTRIES:
+            return jsonify(error=f"Send up to {INGEST_MAX_ENTRIES} entries as a list"), 400
+
+        keys = [
+            entry.get("key")
+            for entry in entries
+            if isinstance(entry, dict) and isinstance(entry.get("key"), str)
+        ]
+        seen = {
+            key
+            for (key,) in db.session.query(IngestKey.key).filter(IngestKey.key.in_(keys))
+        }
+
+        results = []
+        created = []
+        day_deltas = defaultdict(Counter)
+
+        for entry in entries:
+            key = entry.get("key") if isinstance(entry, dict) else None
+
+            # Already stored by an earlier replay (or twice in this batch)
+            if isinstance(key, str) and key in seen:
+                results.append({"key": key, "status": "duplicate"})
+                continue
+
+            try:
+                row = parse_entry(entry)
+            except (KeyError, ValueError) as e:
+                results.append({"key": key, "status": "rejected", "error": str(e)})
+                continue
+            seen.add(key)
+
+            db.session.add(row)
+            day, deltas = ROW_STATS[type(row)](row)
+            day_deltas[day].update(deltas)
+
+            created.append((key, entry["log"], row))
+            results.append({"key": key, "status": "created"})
+
+        if created:
+            add_to_daily_stats(day_deltas)
+            db.session.flush()
+
+            now = utc_now()
+            db.session.add_all(
+                IngestKey(key=key, log_name=log_name, row_id=row.id, created_at=now)
+                for key, log_name, row in created
+            )
+
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Another replay of the same keys won the race; the client retries
+                db.session.rollback()
+                return jsonify(error="Batch overlaps a replay in progress, retry"), 409
+
+        return jsonify(results=results)
+
+
+def parse_entry(entry):
+    # {"key": ..., "log": "feed", "fields": {form field: value}} -> new row
+    if not isinstance(entry, dict):
+        raise ValueError("Entry is not a JSON object")
+
+    key = entry.get("key")
+    if not isinstance(key, str) or not 0 < len(key) <= 64:
+        raise ValueError("Entry needs an idempotency key of 1-64 characters")
+
+    log_name = entry.get("log")
+    if log_name not in IMPORT_LOGS:
+        raise ValueError(f"Unknown log {log_name!r}")
+
+    fields = entry.get("fields")
+    if not isinstance(fields, dict):
+        raise ValueError("Entry fields must be a JSON object")
+
+    # Same validation and derived columns as the create routes
+    model, parse_form = IMPORT_LOGS[log_name]
+    fields = parse_form(as_form(model, fields))
+
+    row = model(**fields)
+    if hasattr(row, "set_times"):
+        row.set_times(fields["date"], fields["start_time"], fields["end_time"])
+
+    # Queued offline, so any number the form showed is stale; assign on insert
+    if model is Feed:
+        row.feed_num = next_feed_num(row.date)
+
+    return row
@@ -0,0 +1,188 @@
+import base64
+import json
+from datetime import date, datetime, time
+
+from flask import abort, render_template, request
+from sqlalchemy import and_, false, or_, tuple_
+
+from archive import log_sources
+from models import db
+from routes.date_range import count_in_range, filter_date_range, parse_date_range
+
+# Cards per list page (and per "See more")
+LIST_PER_PAGE = 5
+
+# Most cards one ?rows= request may ask for
+LIST_MAX_ROWS = 200
+
+
+def encode_cursor(row, order_cols):
+    # Opaque token holding the sort key of the last row on the page
+    return encode_cursor_values([getattr(row, col.key) for col in order_cols])
+
+
+def encode_cursor_values(values):
+    values = [
+        value.isoformat() if isinstance(value, (date, datetime, time)) else value
+        for value in values
+    ]
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor_values(cursor, length):
+    # Raw JSON values of a cursor; 400 if it's garbled or the wrong shape
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        abort(400)
+
+    if not isinstance(values, list) or len(values) != length:
+        abort(400)
+
+    return values
+
+
+def decode_cursor(cursor, order_cols):
+    values = decode_cursor_values(cursor, len(order_cols))
+
+    try:
+        decoded = []
+        for col, value in zip(order_cols, values):
+            py_type = col.type.python_type
+            if value is not None and py_type in (date, datetime, time):
+                value = py_type.fromisoformat(value)
+            decoded.append(value)
+    except (ValueError, TypeError):
+        abort(400)
+
+    return decoded
+
+
+def list_template(log_name):
+    # "See more" asks for ?fragment=1: just the next cards and link, no page chrome
+    if request.args.get("fragment"):
+        return f"partials/_{log_name}_cards.html"
+    return f"{log_name}_list.html"
+
+
+def sort_key(row, order_cols):
+    # Python order matching SQLite's, where NULL sorts before every value
+    return tuple(
+        (value is not None, value)
+        for value in (getattr(row, col.key) for col in order_cols)
+    )
+
+
+def keyset_before(order_cols, last_key):
+    """
+    Filter for rows sorting before `last_key` in descending (order_cols) order.
+
+    A row tuple comparison is one index seek, but NULL never compares, so
+    with a nullable sort column (e.g. feed_num) it would skip those rows;
+    there the comparison is spelled out column by column, NULLs lowest as
+    in sort_key.
+    """
+    if not any(col.expression.nullable for col in order_cols):
+        return tuple_(*order_cols) < tuple(last_key)
+
+    def equal(col, value):
+        return col.is_(None) if value is None else col == value
+
+    def before(col, value):
+        return false() if value is None else or_(col < value, col.is_(None))
+
+    return or_(*[
+        and_(
+            *[equal(col, value) for col, value in zip(order_cols[:i], last_key[:i])],
+            before(order_cols[i], last_key[i]),
+        )
+        for i in range(len(order_cols))
+    ])
+
+
+def keyset_page(sources, per_page, cursor=None, page=0):
+    """
+    Newest-first page across (query, order_cols, is_archive) sources.
+
+    Each source is one log's hot or archive table, ordered by the same
+    columns (last one unique across sources). Rows after `cursor` are found
+    by seeking each index instead of skipping, so every page costs the same;
+    the sources' first per_page + 1 rows are then merged. Old `?page=N`
+    links still fall back to OFFSET. Rows get `archived` set to their
+    source's flag.
+    """
+    # Every source may need to fill the page by itself
+    limit = (page + 1) * per_page + 1 if page > 0 and not cursor else per_page + 1
+
+    merged = []
+    for query, order_cols, is_archive in sources:
+        q = query.order_by(*[col.desc() for col in order_cols])
+
+        if cursor:
+            last_key = decode_cursor(cursor, order_cols)
+            q = q.filter(keyset_before(order_cols, last_key))
+
+        for row in q.limit(limit).all():
+            row.archived = is_archive
+            merged.append((sort_key(row, order_cols), row))
+
+    merged.sort(key=lambda item: item[0], reverse=True)
+    rows = [row for _, row in merged]
+
+    if page > 0 and not cursor:
+        rows = rows[page * per_page:]
+
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    order_cols = sources[0][1]
+    next_cursor = encode_cursor(rows[-1], order_cols) if has_more else None
+
+    return rows, has_more, next_cursor
+
+
+def log_list_page(log_name, model, date_key, order_keys):
+    """
+    Render one list page of a log, newest first, honouring ?cursor/?page
+    and the ?from/?to date range. `date_key` names the column the range
+    filters on, `order_keys` the list order (last one unique).
+
+    ?rows=N makes the page N cards long: live updates re-render every card
+    already on screen, "See more" pages included, in one request.
+    """
+    cursor = request.args.get("cursor")
+    page = request.args.get("page", default=0, type=int)
+    range_from, range_to = parse_date_range(request.args)
+    per_page = min(max(request.args.get("rows", default=0, type=int), LIST_PER_PAGE), LIST_MAX_ROWS)
+
+    # Hot and archived entries, each seeking its own index
+    sources = [
+        (
+            filter_date_range(
+                db.session.query(entity), getattr(entity, date_key), range_from, range_to
+            ),
+            tuple(getattr(entity, key) for key in order_keys),
+            is_archive,
+        )
+        for entity, is_archive in log_sources(model)
+    ]
+
+    rows, has_more, next_cursor = keyset_page(
+        sources,
+        per_page,
+        cursor=cursor,
+        page=page,
+    )
+
+    return render_template(
+        list_template(log_name),
+        rows=rows,
+        has_more=has_more,
+        next_cursor=next_cursor,
+        range_from=range_from,
+        range_to=range_to,
+        range_count=count_in_range([query for query, _, _ in sources], range_from, range_to),
+        page_key=log_name,
+    )
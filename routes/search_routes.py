@@ -0,0 +1,29 @@
+from flask import render_template, request
+
+from routes.conditional import conditional_get
+from routes.timeline_routes import TIMELINE_SOURCES
+from search import search_entries, search_index_exists
+
+
+def init_search_routes(app):
+    # Ranked full-text search over notes across every log
+    @app.get("/search")
+    @conditional_get("diapers", "feed", "sleep", "medication", "vomit")
+    def search():
+        query = request.args.get("q", "").strip()
+
+        available = search_index_exists()
+        results = []
+        if query and available:
+            for kind, row, snippet in search_entries(query):
+                # Same timestamp the timeline sorts on
+                ts = getattr(row, TIMELINE_SOURCES[kind][1].key)
+                results.append((kind, ts, row, snippet))
+
+        return render_template(
+            "search.html",
+            query=query,
+            results=results,
+            available=available,
+            page_key="dashboard",
+        )
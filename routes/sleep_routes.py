@@ -1,31 +1,43 @@
-from datetime import date, datetime, time, timedelta
+from datetime import date, time
 
 from flask import flash, redirect, render_template, request, url_for
 
+from active_sessions import stop_session
+from daily_stats import record_daily_stats, retract_daily_stats
 from models import db, Sleep
+from routes.conditional import conditional_get
+from routes.pagination import log_list_page
+
+
+def parse_sleep_form(form):
+    """Validated Sleep fields from a submitted form."""
+    # Raw values from form
+    sleep_date_str = form["date"]
+    start_time_str = form["start_time"]
+    end_time_str = form["end_time"]
+    notes = (form.get("notes") or "").strip() or None
+
+    # SQLite Date type must be Python date object for table
+    sleep_date = date.fromisoformat(sleep_date_str)
+
+    # SQLite Time type must be Python time object for table
+    start_time = time.fromisoformat(start_time_str)
+    end_time = time.fromisoformat(end_time_str) if end_time_str else None
+
+    return {
+        "date": sleep_date,
+        "start_time": start_time,
+        "end_time": end_time,
+        "notes": notes,
+    }
 
 
 def init_sleep_routes(app):
     # Show history of sleep
     @app.get("/sleep")
+    @conditional_get("sleep")
     def sleep_list():
-        PER_PAGE = 5
-        page = request.args.get("page", default=0, type=int)
-        offset = page * PER_PAGE
-
-        q = Sleep.query.order_by(Sleep.date.desc(), Sleep.start_time.desc())
-        rows = q.offset(offset).limit(PER_PAGE + 1).all()
-
-        has_more = len(rows) > PER_PAGE
-        rows = rows[:PER_PAGE]
-
-        return render_template(
-            "sleep_list.html",
-            rows=rows,
-            page=page,
-            has_more=has_more,
-            page_key="sleep",
-        )
+        return log_list_page("sleep", Sleep, "date", ("date", "start_time", "id"))
 
     # New sleep entry form
     @app.get("/sleep/new")
@@ -42,43 +54,14 @@ def init_sleep_routes(app):
     # Create new sleep entry
     @app.post("/sleep/new")
     def sleep_create():
-        # Raw values from form
-        sleep_date_str = request.form["date"]
-        start_time_str = request.form["start_time"]
-        end_time_str = request.form["end_time"]
-        notes = request.form.get("notes").strip() or None
-
-        # SQLite Date type must be Python date object for table
-        sleep_date = date.fromisoformat(sleep_date_str)
-
-        # SQLite Time type must be Python time object for table
-        start_time = time.fromisoformat(start_time_str)
-        end_time = time.fromisoformat(end_time_str) if end_time_str else None
-
-        # Compute sleep duration only if end_time is provided
-        if end_time:
-            start_dt = datetime.combine(sleep_date, start_time)
-            end_dt = datetime.combine(sleep_date, end_time)
-            
-            # Handle case where sleep goes past midnight
-            if end_dt <= start_dt:
-                end_dt += timedelta(days=1)
-            
-            # Compute sleep duration in minutes
-            sleep_duration = end_dt - start_dt
-            sleep_duration_min = sleep_duration.total_seconds() // 60
-        else:
-            sleep_duration_min = None
-
-        row = Sleep(
-            date=sleep_date,
-            start_time=start_time,
-            end_time=end_time,
-            sleep_duration_min=sleep_duration_min,
-            notes=notes
-        )
+        fields = parse_sleep_form(request.form)
+
+        # Sleep duration is computed from the times (handles past midnight)
+        row = Sleep(**fields)
+        row.set_times(fields["date"], fields["start_time"], fields["end_time"])
         
         db.session.add(row)
+        record_daily_stats(row)
         db.session.commit()
 
         flash("Saved sleep entry.", "success")
@@ -99,50 +82,36 @@ def init_sleep_routes(app):
     def sleep_update(sleep_id):
         row = Sleep.query.get_or_404(sleep_id)
 
-        # Raw values from form
-        sleep_date_str = request.form["date"]
-        start_time_str = request.form["start_time"]
-        end_time_str = request.form["end_time"]
-        notes = request.form.get("notes").strip() or None
-
-        # SQLite Date type must be Python date object for table
-        sleep_date = date.fromisoformat(sleep_date_str)
-
-        # SQLite Time type must be Python time object for table
-        start_time = time.fromisoformat(start_time_str)
-        end_time = time.fromisoformat(end_time_str) if end_time_str else None
-
-        # Compute sleep duration only if end_time is provided
-        if end_time:
-            start_dt = datetime.combine(sleep_date, start_time)
-            end_dt = datetime.combine(sleep_date, end_time)
-            
-            # Handle case where sleep goes past midnight
-            if end_dt <= start_dt:
-                end_dt += timedelta(days=1)
-            
-            # Compute sleep duration in minutes
-            sleep_duration = end_dt - start_dt
-            sleep_duration_min = sleep_duration.total_seconds() // 60
-        else:
-            sleep_duration_min = None
+        fields = parse_sleep_form(request.form)
+
+        # Take old values out of the daily counters
+        retract_daily_stats(row)
 
         # Apply updates
-        row.date = sleep_date
-        row.start_time = start_time
-        row.end_time = end_time
-        row.sleep_duration_min = sleep_duration_min
-        row.notes = notes
+        row.set_times(fields["date"], fields["start_time"], fields["end_time"])
+        row.notes = fields["notes"]
+        record_daily_stats(row)
 
         db.session.commit()
 
         flash("Sleep entry updated.")
         return redirect(url_for("sleep_list"))
 
+    # End a running sleep now, without the edit form
+    @app.post("/sleep/<int:sleep_id>/stop")
+    def sleep_stop(sleep_id):
+        stopped = stop_session(Sleep, sleep_id)
+        if stopped is None:
+            flash("That sleep has already ended.")
+        else:
+            flash(f"Sleep stopped after {stopped[1]} min.", "success")
+        return redirect(url_for("dashboard"))
+
     # Delete sleep entry
     @app.post("/sleep/<int:sleep_id>/delete")
     def sleep_delete(sleep_id):
         row = Sleep.query.get_or_404(sleep_id)    # Find entry
+        retract_daily_stats(row)                  # Update daily counters
         db.session.delete(row)                    # Mark for delete
         db.session.commit()                       # Save change
         flash("Sleep entry deleted.", "success")  # Notify user
@@ -0,0 +1,69 @@
+from datetime import date, timedelta
+
+from flask import jsonify, render_template, request
+
+from routes.conditional import conditional_get
+from trends import BUCKETS, MAX_RANGE_DAYS, TREND_TABLES, default_range, trend_series
+
+# Charts on the trends page: (series name, label, unit)
+TREND_CHARTS = [
+    ("feed_ml", "Feed volume", "mL"),
+    ("feeds", "Feeds", ""),
+    ("feed_rate_avg", "Avg feed rate", "mL/hr"),
+    ("feed_duration_avg_min", "Avg feed duration", "min"),
+    ("sleep_min", "Sleep", "min"),
+    ("wet_diapers", "Wet diapers", ""),
+    ("bm_diapers", "BM diapers", ""),
+    ("vomits", "Vomits", ""),
+    ("med_doses", "Medication doses", ""),
+]
+
+
+def parse_stats_range(args):
+    # ?bucket=day|week|month&start=YYYY-MM-DD&end=YYYY-MM-DD, both dates optional
+    bucket = args.get("bucket", "day")
+    if bucket not in BUCKETS:
+        raise ValueError(f"bucket must be one of {', '.join(BUCKETS)}")
+
+    default_start, default_end = default_range(bucket)
+    end = date.fromisoformat(args["end"]) if args.get("end") else default_end
+    start = date.fromisoformat(args["start"]) if args.get("start") else default_start
+
+    if not args.get("start") and args.get("end"):
+        # Same default span, ending on the requested day
+        start = end - (default_end - default_start)
+
+    if start > end:
+        raise ValueError("start must be on or before end")
+    if end - start > timedelta(days=MAX_RANGE_DAYS):
+        raise ValueError(f"Range is limited to {MAX_RANGE_DAYS} days")
+
+    return bucket, start, end
+
+
+def init_stats_routes(app):
+    # Time-bucketed series for charts
+    @app.get("/api/stats")
+    @conditional_get(*TREND_TABLES, per_minute=True)
+    def stats_api():
+        try:
+            bucket, start, end = parse_stats_range(request.args)
+        except ValueError as e:
+            return jsonify(error=str(e)), 400
+
+        return jsonify(trend_series(bucket, start, end))
+
+    # Chart view over /api/stats
+    @app.get("/trends")
+    def trends():
+        bucket = request.args.get("bucket", "day")
+        if bucket not in BUCKETS:
+            bucket = "day"
+
+        return render_template(
+            "trends.html",
+            bucket=bucket,
+            buckets=BUCKETS,
+            charts=TREND_CHARTS,
+            page_key="dashboard",
+        )
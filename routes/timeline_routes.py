@@ -0,0 +1,136 @@
+from datetime import datetime
+from itertools import groupby
+
+from flask import abort, render_template, request
+from sqlalchemy import literal, union_all
+
+from archive import archived, log_sources
+from models import db, Diaper, Feed, Medication, Sleep, Vomit
+from routes.conditional import conditional_get
+from routes.pagination import decode_cursor_values, encode_cursor_values
+
+# Event type -> (model, indexed timestamp column it sorts on)
+TIMELINE_SOURCES = {
+    "diaper": (Diaper, Diaper.dt),
+    "feed": (Feed, Feed.start_dt),
+    "medication": (Medication, Medication.dt),
+    "sleep": (Sleep, Sleep.start_dt),
+    "vomit": (Vomit, Vomit.dt),
+}
+
+TIMELINE_PER_PAGE = 20
+
+
+def parse_timeline_cursor(cursor):
+    # (timestamp, type, id) of the last event shown
+    ts, kind, row_id = decode_cursor_values(cursor, 3)
+    try:
+        ts = datetime.fromisoformat(ts)
+    except (TypeError, ValueError):
+        abort(400)
+    if kind not in TIMELINE_SOURCES or not isinstance(row_id, int):
+        abort(400)
+    return ts, kind, row_id
+
+
+def timeline_page(kinds, per_page, cursor=None):
+    """
+    Newest-first events across the chosen logs, ordered by (time, type, id).
+
+    One UNION ALL of per-table subqueries (hot and archive for each log),
+    each seeking its own timestamp index and stopping after per_page + 1
+    rows, so any depth costs the same.
+    Returns ([(type, timestamp, row), ...], has_more, next_cursor).
+    """
+    last = parse_timeline_cursor(cursor) if cursor else None
+
+    branches = []
+    for kind in kinds:
+        model, hot_ts_col = TIMELINE_SOURCES[kind]
+
+        # One branch per table: the hot log and its archive copy
+        for entity, is_archive in log_sources(model):
+            ts_col = getattr(entity, hot_ts_col.key)
+
+            q = db.select(
+                ts_col.label("ts"),
+                literal(kind).label("kind"),
+                entity.id.label("id"),
+                literal(is_archive).label("archived"),
+            ).where(ts_col.isnot(None))
+
+            if last is not None:
+                last_ts, last_kind, last_id = last
+                # Rows sorting after the cursor, given this branch's fixed type
+                if kind < last_kind:
+                    q = q.where(ts_col <= last_ts)
+                elif kind == last_kind:
+                    q = q.where((ts_col < last_ts) | ((ts_col == last_ts) & (entity.id < last_id)))
+                else:
+                    q = q.where(ts_col < last_ts)
+
+            q = q.order_by(ts_col.desc(), entity.id.desc()).limit(per_page + 1)
+            branches.append(db.select(q.subquery()))
+
+    if not branches:
+        return [], False, None
+
+    merged = union_all(*branches).subquery()
+    keys = db.session.execute(
+        db.select(merged.c.ts, merged.c.kind, merged.c.id, merged.c.archived)
+        .order_by(merged.c.ts.desc(), merged.c.kind.desc(), merged.c.id.desc())
+        .limit(per_page + 1)
+    ).all()
+
+    has_more = len(keys) > per_page
+    keys = keys[:per_page]
+
+    # Full rows, one IN query per type and table on the page
+    ids_by_source = {}
+    for _, kind, row_id, is_archive in keys:
+        ids_by_source.setdefault((kind, bool(is_archive)), []).append(row_id)
+
+    rows_by_key = {}
+    for (kind, is_archive), ids in ids_by_source.items():
+        model = TIMELINE_SOURCES[kind][0]
+        entity = archived(model) if is_archive else model
+        for row in db.session.query(entity).filter(entity.id.in_(ids)):
+            row.archived = is_archive
+            rows_by_key[(kind, row.id)] = row
+
+    events = [(kind, ts, rows_by_key[(kind, row_id)]) for ts, kind, row_id, _ in keys]
+    next_cursor = encode_cursor_values(list(keys[-1])[:3]) if has_more else None
+
+    return events, has_more, next_cursor
+
+
+def init_timeline_routes(app):
+    # Every log merged into one newest-first stream
+    @app.get("/timeline")
+    @conditional_get("diapers", "feed", "sleep", "medication", "vomit")
+    def timeline():
+        kinds = [kind for kind in request.args.getlist("type") if kind in TIMELINE_SOURCES]
+        if not kinds:
+            kinds = list(TIMELINE_SOURCES)
+
+        events, has_more, next_cursor = timeline_page(
+            kinds,
+            TIMELINE_PER_PAGE,
+            cursor=request.args.get("cursor"),
+        )
+
+        # Day headings; events are already newest first
+        days = [
+            (day, list(day_events))
+            for day, day_events in groupby(events, key=lambda event: event[1].date())
+        ]
+
+        return render_template(
+            "timeline.html",
+            days=days,
+            has_more=has_more,
+            next_cursor=next_cursor,
+            kinds=kinds,
+            all_kinds=list(TIMELINE_SOURCES),
+            page_key="dashboard",
+        )
@@ -3,30 +3,45 @@ from datetime import datetime
 from flask import flash, redirect, render_template, request, url_for
 from sqlalchemy import func
 
+from daily_stats import record_daily_stats, retract_daily_stats
 from models import db, Vomit
+from routes.conditional import conditional_get
+from routes.pagination import log_list_page
+
+
+def parse_vomit_form(form):
+    """Validated Vomit fields from a submitted form."""
+    # Raw values from form
+    dt_str = form["dt"]
+    vomit_size = form["vomit_size"]
+    feed_rate_raw = form["feed_rate"].strip()
+    vomit_reason = (form.get("vomit_reason") or "").strip() or None
+
+    # Convert date string to datetime
+    dt = datetime.fromisoformat(dt_str)
+
+    # Ensure inputs are stored as integers
+    feed_rate = int(feed_rate_raw) if feed_rate_raw else None
+
+    # Size must be one of the Enum values
+    sizes = Vomit.vomit_size.type.enums
+    if vomit_size not in sizes:
+        raise ValueError(f"Vomit size must be one of {', '.join(sizes)}")
+
+    return {
+        "dt": dt,
+        "vomit_size": vomit_size,
+        "feed_rate": feed_rate,
+        "vomit_reason": vomit_reason,
+    }
 
 
 def init_vomit_routes(app):
     # Show history of vomits
     @app.get("/vomit")
+    @conditional_get("vomit")
     def vomit_list():
-        PER_PAGE = 5
-        page = request.args.get("page", default=0, type=int)
-        offset = page * PER_PAGE
-
-        q = Vomit.query.order_by(Vomit.dt.desc())
-        rows = q.offset(offset).limit(PER_PAGE + 1).all()
-
-        has_more = len(rows) > PER_PAGE
-        rows = rows[:PER_PAGE]
-
-        return render_template(
-            "vomit_list.html",
-            rows=rows,
-            page=page,
-            has_more=has_more,
-            page_key="vomit",
-        )
+        return log_list_page("vomit", Vomit, "dt", ("dt", "id"))
 
     # New vomit entry form
     @app.get("/vomit/new")
@@ -39,27 +54,12 @@ def init_vomit_routes(app):
     # Create new vomit entry
     @app.post("/vomit/new")
     def vomit_create():
-        # Raw values from form
-        dt_str = request.form["dt"]
-        vomit_size = request.form["vomit_size"]
-        feed_rate = request.form["feed_rate"].strip()
-        vomit_reason = request.form.get("vomit_reason").strip() or None
-        
-        # Convert date string to datetime
-        dt = datetime.fromisoformat(dt_str)
-
-        # Ensure inputs are stored as integers
-        feed_rate_raw = request.form["feed_rate"].strip()
-        feed_rate = int(feed_rate_raw) if feed_rate_raw else None
-
-        row = Vomit(
-            dt=dt,
-            vomit_size=vomit_size,
-            feed_rate=feed_rate,
-            vomit_reason=vomit_reason
-        )
+        fields = parse_vomit_form(request.form)
+
+        row = Vomit(**fields)
         
         db.session.add(row)
+        record_daily_stats(row)
         db.session.commit()
 
         flash("Saved vomit entry.", "success")
@@ -80,24 +80,17 @@ def init_vomit_routes(app):
     def vomit_update(vomit_id):
         row = Vomit.query.get_or_404(vomit_id)
 
-        # Raw values from form
-        dt_str = request.form["dt"]
-        vomit_size = request.form["vomit_size"]
-        feed_rate = request.form["feed_rate"].strip()
-        vomit_reason = request.form.get("vomit_reason").strip() or None
-
-        # SQLite Date type must be Python date object for table
-        dt = datetime.fromisoformat(dt_str)
+        fields = parse_vomit_form(request.form)
 
-        # Ensure inputs are stored as integers
-        feed_rate_raw = request.form["feed_rate"].strip()
-        feed_rate = int(feed_rate_raw) if feed_rate_raw else None
+        # Take old values out of the daily counters
+        retract_daily_stats(row)
 
         # Apply updates
-        row.dt = dt
-        row.vomit_size = vomit_size
-        row.feed_rate = feed_rate
-        row.vomit_reason = vomit_reason
+        row.dt = fields["dt"]
+        row.vomit_size = fields["vomit_size"]
+        row.feed_rate = fields["feed_rate"]
+        row.vomit_reason = fields["vomit_reason"]
+        record_daily_stats(row)
 
         db.session.commit()
 
@@ -108,6 +101,7 @@ def init_vomit_routes(app):
     @app.post("/vomit/<int:vomit_id>/delete")
     def vomit_delete(vomit_id):
         row = Vomit.query.get_or_404(vomit_id)     # Find entry
+        retract_daily_stats(row)                   # Update daily counters
         db.session.delete(row)                    # Mark for delete
         db.session.commit()                       # Save change
         flash("Vomit entry deleted.", "success")  # Notify user
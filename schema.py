@@ -0,0 +1,193 @@
+import logging
+
+from sqlalchemy import MetaData, func, inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.schema import CreateTable
+
+from archive import ARCHIVE_LOGS, archive_db_path, ensure_archive_file, seed_log_id_sequences
+from daily_stats import rebuild_daily_stats
+from models import db, DailyStat, Feed, SchemaVersion, Sleep
+from search import create_search_index, rebuild_search_index, search_index_exists
+from table_versions import utc_now
+
+log = logging.getLogger(__name__)
+
+
+def read_schema_version():
+    # Highest migration applied; 0 for databases from before versioning
+    try:
+        return db.session.query(func.max(SchemaVersion.version)).scalar() or 0
+    except OperationalError:
+        db.session.rollback()
+        return 0
+
+
+def upgrade_schema():
+    """
+    Bring the database up to SCHEMA_VERSION.
+
+    A current database costs one query: no create_all, no reflection.
+    Otherwise tables and columns are synced to the models (and the archive
+    file's log tables), each pending migration runs in order and is
+    recorded, and only then are missing indexes built, since a unique index
+    may need a migration to clean up the data first. Migrations must be
+    safe to re-run, since databases from before versioning start at 0.
+    """
+    current = read_schema_version()
+    if current >= SCHEMA_VERSION:
+        return False
+
+    db.create_all()
+    add_missing_columns()
+    ensure_archive_file(archive_db_path())
+
+    for version, migrate in enumerate(MIGRATIONS[current:], start=current + 1):
+        log.info("Applying schema migration %d: %s", version, migrate.__name__)
+        migrate()
+        db.session.add(SchemaVersion(version=version, applied_at=utc_now()))
+        db.session.commit()
+
+    create_missing_indexes()
+
+    return True
+
+
+def add_missing_columns():
+    inspector = inspect(db.engine)
+
+    for table in db.metadata.sorted_tables:
+        existing = {col["name"] for col in inspector.get_columns(table.name)}
+
+        for column in table.columns:
+            if column.name in existing:
+                continue
+
+            col_type = column.type.compile(dialect=db.engine.dialect)
+            with db.engine.begin() as conn:
+                conn.execute(text(
+                    f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {col_type}'
+                ))
+
+
+def make_feed_numbers_unique():
+    """
+    Renumber days with duplicate feed numbers, then build the unique index.
+
+    Older databases have either no (date, feed_num) index or a non-unique
+    one, and may hold duplicates either way. Those days are renumbered in
+    start-time order, any non-unique index is dropped, and the unique one
+    is built here rather than left to the index sync.
+    """
+    duplicate_days = (
+        db.session.query(Feed.date)
+        .filter(Feed.feed_num.isnot(None))
+        .group_by(Feed.date, Feed.feed_num)
+        .having(func.count() > 1)
+        .distinct()
+        .all()
+    )
+
+    for (day,) in duplicate_days:
+        rows = (
+            Feed.query.filter(Feed.date == day)
+            .order_by(Feed.start_time, Feed.id)
+            .all()
+        )
+        for feed_num, row in enumerate(rows, start=1):
+            row.feed_num = feed_num
+
+    db.session.commit()
+
+    for index in inspect(db.engine).get_indexes("feed"):
+        if index["column_names"] == ["date", "feed_num"] and not index["unique"]:
+            db.session.execute(text(f'DROP INDEX "{index["name"]}"'))
+    db.session.commit()
+
+    for index in Feed.__table__.indexes:
+        if index.name == "ix_feed_date_feed_num":
+            index.create(db.engine, checkfirst=True)
+
+
+def create_missing_indexes():
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+
+
+def backfill_session_times():
+    # Rows written before start_dt/end_dt/duration were stored
+    for model in (Feed, Sleep):
+        rows = model.query.filter(model.start_dt.is_(None)).all()
+
+        for row in rows:
+            row.set_times(row.date, row.start_time, row.end_time)
+
+    db.session.commit()
+
+
+def fill_daily_stats():
+    # The rollup arrived after the log tables; fill it once from them
+    if DailyStat.query.first() is None:
+        rebuild_daily_stats()
+
+
+def create_active_session_indexes():
+    # Partial indexes on running feeds/sleeps; the index sync would build
+    # them too, but only once a version bump makes startup run it
+    for model in (Feed, Sleep):
+        for index in model.__table__.indexes:
+            if index.name.endswith("_active"):
+                index.create(db.engine, checkfirst=True)
+
+
+def make_log_ids_autoincrement():
+    """
+    Rebuild the log tables with AUTOINCREMENT ids.
+
+    Plain INTEGER PRIMARY KEY ids restart at max(id) + 1, so once the hot
+    rows are gone a new entry could take an id the archive already holds.
+    Each table is copied into an AUTOINCREMENT one (indexes come back from
+    the index sync, search triggers just below), and its id sequence is
+    seeded past every id in both files.
+    """
+    for model in ARCHIVE_LOGS:
+        table = model.__tablename__
+        table_sql = db.session.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": table},
+        ).scalar()
+
+        if "AUTOINCREMENT" not in table_sql.upper():
+            rebuilt = f"_rebuild_{table}"
+            cols = ", ".join(f'"{name}"' for name in model.__table__.columns.keys())
+            db.session.execute(CreateTable(model.__table__.to_metadata(MetaData(), name=rebuilt)))
+            db.session.execute(text(f'INSERT INTO "{rebuilt}" ({cols}) SELECT {cols} FROM "{table}"'))
+            db.session.execute(text(f'DROP TABLE "{table}"'))
+            db.session.execute(text(f'ALTER TABLE "{rebuilt}" RENAME TO "{table}"'))
+
+    seed_log_id_sequences()
+    db.session.commit()
+
+    # Dropping the old tables dropped their triggers
+    create_search_index()
+
+
+def reindex_archived_entries():
+    # Earlier archive runs dropped moved entries from search; index them again
+    if search_index_exists():
+        rebuild_search_index()
+
+
+# Ordered; append new ones (never reorder). A database's version is the
+# number that have run, so only the new ones run on the next start
+MIGRATIONS = [
+    backfill_session_times,
+    make_feed_numbers_unique,
+    create_search_index,
+    fill_daily_stats,
+    create_active_session_indexes,
+    make_log_ids_autoincrement,
+    reindex_archived_entries,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
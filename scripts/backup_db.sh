@@ -1,19 +1,10 @@
 #!/bin/sh
 set -eu
 
-DB_PATH="/volume1/web_apps/eli-care-log-data/eli_care_log.db"
-BACKUP_DIR="/volume1/web_apps/eli-care-log-backups"
+# The app backs itself up on a schedule (see backup.py); this takes one
+# more right now, e.g. before a deploy. Archives land in the backups bind
+# mount (/volume1/web_apps/eli-care-log-backups), newest 60 kept.
 
-mkdir -p "$BACKUP_DIR"
+CONTAINER_NAME="eli-care-log"
 
-TS="$(date +%Y-%m-%d_%H%M%S)"
-OUT_DB="${BACKUP_DIR}/eli_care_log_${TS}.db"
-
-# Make consistent snapshot
-sqlite3 "$DB_PATH" ".backup '$OUT_DB'"
-
-# Compress
-gzip "$OUT_DB"
-
-# Keep last 60 backups
-ls -1t "${BACKUP_DIR}"/eli_care_log_*.db.gz | tail -n +61 | xargs -r rm --
+sudo docker exec "$CONTAINER_NAME" flask backup-db
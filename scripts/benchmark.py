@@ -0,0 +1,260 @@
+"""
+Time list pages, the dashboard and write handlers on seeded synthetic data.
+
+Each dataset size runs in a fresh process against its own temp database,
+and the results go to benchmarks/<commit>_<time>.json:
+
+    python scripts/benchmark.py                      # default sizes
+    python scripts/benchmark.py --days 365 1095 --repeat 50
+    python scripts/benchmark.py --compare old.json new.json
+"""
+import argparse
+from datetime import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks")
+
+DEFAULT_DAYS = [90, 365, 3 * 365]
+DEFAULT_REPEAT = 20
+DEFAULT_SEED = 0
+
+# How far into each list the "deep page" cases start (rows, newest first)
+DEEP_FRACTIONS = (0.5, 0.99)
+LIST_PER_PAGE = 5
+
+# Slower than this (new / old) is flagged by --compare
+REGRESSION_RATIO = 1.25
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    return {
+        "min_ms": round(samples[0], 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "runs": repeat,
+    }
+
+
+def run_size(days, seed, repeat):
+    # Runs inside the child process, with ELI_DB_DIR already pointing at a temp dir
+    sys.path.insert(0, ROOT_DIR)
+
+    from app import app
+    from dashboard_stats import invalidate_dashboard_snapshot
+    from models import db, Diaper, Feed, Medication, Sleep, Vomit
+    from routes.pagination import encode_cursor
+    from synthetic_data import generate_synthetic_data
+
+    list_pages = {
+        "diaper": (Diaper, (Diaper.dt, Diaper.id)),
+        "feed": (Feed, (Feed.date, Feed.feed_num, Feed.id)),
+        "sleep": (Sleep, (Sleep.date, Sleep.start_time, Sleep.id)),
+        "medication": (Medication, (Medication.dt, Medication.id)),
+        "vomit": (Vomit, (Vomit.dt, Vomit.id)),
+    }
+
+    results = {}
+    client = app.test_client()
+
+    def get(url):
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.status_code)
+
+    def post(url, data):
+        response = client.post(url, data=data)
+        assert response.status_code == 302, (url, response.status_code)
+
+    with app.app_context():
+        start = time.perf_counter()
+        rows = generate_synthetic_data(days, seed=seed)
+        seed_seconds = time.perf_counter() - start
+
+        # Cursors and OFFSET page numbers for the deep-page cases
+        deep_urls = {}
+        for log_name, (model, order_cols) in list_pages.items():
+            total = model.query.count()
+            for fraction in DEEP_FRACTIONS:
+                depth = int(total * fraction)
+                row = (
+                    model.query
+                    .order_by(*[col.desc() for col in order_cols])
+                    .offset(depth)
+                    .first()
+                )
+                pct = int(fraction * 100)
+                if row is not None:
+                    cursor = encode_cursor(row, order_cols)
+                    deep_urls[f"{log_name}_list.cursor_{pct}pct"] = f"/{log_name}?cursor={cursor}"
+                deep_urls[f"{log_name}_list.offset_{pct}pct"] = (
+                    f"/{log_name}?page={depth // LIST_PER_PAGE}"
+                )
+
+        feed_days = db.session.query(Feed.id, Feed.date).limit(repeat).all()
+        db.session.remove()
+
+    # List pages: first page, then deep pages by cursor and by legacy OFFSET
+    for log_name in list_pages:
+        results[f"{log_name}_list.first_page"] = timed(lambda: get(f"/{log_name}"), repeat)
+    for name, url in sorted(deep_urls.items()):
+        results[name] = timed(lambda: get(url), repeat)
+
+    # Dashboard: rebuilding the snapshot vs serving the cached one
+    def dashboard_cold():
+        invalidate_dashboard_snapshot()
+        get("/")
+
+    results["dashboard.cold"] = timed(dashboard_cold, repeat)
+    results["dashboard.warm"] = timed(lambda: get("/"), repeat)
+
+    # Write handlers (each call commits one row)
+    feed_form = {
+        "date": datetime.now().date().isoformat(),
+        "feed_num": "",
+        "start_time": "23:30",
+        "end_time": "00:10",
+        "feed_vol_ml": "80",
+        "feed_rate": "120",
+        "notes": "",
+    }
+    diaper_form = {
+        "dt": datetime.now().isoformat(timespec="minutes"),
+        "wet_diaper_size": "M",
+        "bm_diaper_size": "",
+        "notes": "",
+    }
+    results["feed_create"] = timed(lambda: post("/feed/new", feed_form), repeat)
+    results["diaper_create"] = timed(lambda: post("/diaper/new", diaper_form), repeat)
+
+    # Edits keep each feed on its own day and number
+    edits = iter(feed_days * 2)
+
+    def feed_update():
+        feed_id, day = next(edits)
+        post(f"/feed/{feed_id}/edit", {**feed_form, "date": day.isoformat()})
+
+    results["feed_update"] = timed(feed_update, repeat)
+
+    # Feed.duration_min on 1000 loaded feeds
+    with app.app_context():
+        feeds = Feed.query.limit(1000).all()
+        results["feed.duration_min_x1000"] = timed(
+            lambda: [feed.duration_min for feed in feeds],
+            repeat,
+        )
+        db.session.remove()
+
+    return {"days": days, "seed": seed, "rows": rows, "seed_seconds": round(seed_seconds, 2), "timings": results}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_all(days_list, seed, repeat):
+    runs = []
+    for days in days_list:
+        print(f"== {days} days", file=sys.stderr)
+        with tempfile.TemporaryDirectory() as db_dir:
+            env = dict(os.environ, ELI_DB_DIR=db_dir)
+            output = subprocess.check_output(
+                [sys.executable, __file__, "--child", str(days), "--seed", str(seed), "--repeat", str(repeat)],
+                env=env,
+                cwd=ROOT_DIR,
+                text=True,
+            )
+        # Last line is the result; anything before it is app logging
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": runs,
+    }
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(RESULTS_DIR, f"{report['commit']}_{stamp}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for run in runs:
+        print(f"\n{run['days']} days ({sum(run['rows'].values())} rows, seeded in {run['seed_seconds']}s)")
+        for name, timing in run["timings"].items():
+            print(f"  {name:40} {timing['median_ms']:9.3f} ms median")
+    print(f"\nwrote {os.path.relpath(path, ROOT_DIR)}")
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    old_runs = {run["days"]: run for run in old["runs"]}
+    regressions = 0
+
+    print(f"{old['commit']} -> {new['commit']} (median ms)")
+    for run in new["runs"]:
+        base = old_runs.get(run["days"])
+        if base is None:
+            continue
+
+        print(f"\n{run['days']} days")
+        for name, timing in run["timings"].items():
+            if name not in base["timings"]:
+                continue
+            before = base["timings"][name]["median_ms"]
+            after = timing["median_ms"]
+            ratio = after / before if before else float("inf")
+            flag = "  SLOWER" if ratio >= REGRESSION_RATIO else ""
+            regressions += bool(flag)
+            print(f"  {name:40} {before:9.3f} -> {after:9.3f}  x{ratio:.2f}{flag}")
+
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, nargs="+", default=DEFAULT_DAYS,
+                        help="dataset sizes, in days of round-the-clock logging")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"),
+                        help="compare two result files instead of running")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_size(args.child, args.seed, args.repeat)))
+        return 0
+    if args.compare:
+        return compare(*args.compare)
+
+    run_all(args.days, args.seed, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,19 +11,30 @@ CONTAINER_NAME="eli-care-log"
 HOST_PORT="5050"
 CONTAINER_PORT="5000"
 
+# Seconds docker waits after SIGTERM; keep above ELI_GRACEFUL_TIMEOUT
+STOP_TIMEOUT="30"
+
 # DB bind mount
 HOST_DB_DIR="/volume1/web_apps/eli-care-log-data"
 CONTAINER_DB_DIR="/app/db"
 
+# Backups bind mount (written by the app itself, see backup.py)
+HOST_BACKUP_DIR="/volume1/web_apps/eli-care-log-backups"
+CONTAINER_BACKUP_DIR="/app/backups"
+
 echo "== cd to repo"
 cd "$APP_DIR"
 
 echo "== git pull"
 git pull
 
-echo "== stop container if running"
+# Build while the old container keeps serving
+echo "== build image"
+sudo docker build -t "$IMAGE_NAME" .
+
+echo "== stop container if running (graceful)"
 if sudo docker ps -q -f name="^${CONTAINER_NAME}$" | grep -q .; then
-  sudo docker stop "$CONTAINER_NAME"
+  sudo docker stop --time "$STOP_TIMEOUT" "$CONTAINER_NAME"
 fi
 
 echo "== remove container if exists"
@@ -31,15 +42,14 @@ if sudo docker ps -aq -f name="^${CONTAINER_NAME}$" | grep -q .; then
   sudo docker rm "$CONTAINER_NAME"
 fi
 
-echo "== build image"
-sudo docker build -t "$IMAGE_NAME" .
-
 echo "== run container"
 sudo docker run -d \
   --name "$CONTAINER_NAME" \
   -p "${HOST_PORT}:${CONTAINER_PORT}" \
   -v "${HOST_DB_DIR}:${CONTAINER_DB_DIR}" \
+  -v "${HOST_BACKUP_DIR}:${CONTAINER_BACKUP_DIR}" \
   --restart unless-stopped \
+  --stop-timeout "$STOP_TIMEOUT" \
   "$IMAGE_NAME"
 
 echo "== show status"
@@ -0,0 +1,68 @@
+"""
+Download third-party CSS and fonts into static/vendor/.
+
+Pages then load everything from this server, so they work on a LAN with
+no internet. Run once (with internet) and commit the results:
+
+    python scripts/vendor_assets.py
+"""
+import os
+import re
+import urllib.request
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+VENDOR_DIR = os.path.join(STATIC_DIR, "vendor")
+
+BOOTSTRAP_URL = "https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/css/bootstrap.min.css"
+NUNITO_CSS_URL = (
+    "https://fonts.googleapis.com/css2?family=Nunito:wght@400;500;600;700&display=swap"
+)
+
+# Google Fonts only serves woff2 to browsers it recognizes
+BROWSER_UA = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+
+FONT_URL_RE = re.compile(r"url\((https://fonts\.gstatic\.com/[^)]+\.woff2)\)")
+SOURCE_MAP_RE = re.compile(r"/\*# sourceMappingURL=.*?\*/")
+
+
+def fetch(url):
+    req = urllib.request.Request(url, headers={"User-Agent": BROWSER_UA})
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        return resp.read()
+
+
+def write(rel_path, data):
+    path = os.path.join(VENDOR_DIR, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    print(f"wrote static/vendor/{rel_path} ({len(data)} bytes)")
+
+
+def vendor_bootstrap():
+    css = fetch(BOOTSTRAP_URL).decode("utf-8")
+
+    # The .map file is not vendored
+    css = SOURCE_MAP_RE.sub("", css).rstrip() + "\n"
+
+    write("bootstrap/bootstrap.min.css", css.encode("utf-8"))
+
+
+def vendor_nunito():
+    css = fetch(NUNITO_CSS_URL).decode("utf-8")
+
+    # One woff2 per unicode-range subset; browsers only fetch what they need
+    for i, font_url in enumerate(dict.fromkeys(FONT_URL_RE.findall(css))):
+        filename = f"nunito-{i}.woff2"
+        write(f"nunito/{filename}", fetch(font_url))
+        css = css.replace(font_url, filename)
+
+    write("nunito/nunito.css", css.encode("utf-8"))
+
+
+if __name__ == "__main__":
+    vendor_bootstrap()
+    vendor_nunito()
@@ -0,0 +1,201 @@
+from html import escape
+import logging
+import re
+
+from markupsafe import Markup
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from archive import ARCHIVE_SCHEMA, log_sources
+from models import db, Diaper, Feed, Medication, Sleep, Vomit
+
+log = logging.getLogger(__name__)
+
+SEARCH_TABLE = "search_index"
+
+# Type -> (model, searchable text columns, code stored in the index rowid)
+SEARCH_SOURCES = {
+    "diaper": (Diaper, ("notes",), 1),
+    "feed": (Feed, ("notes",), 2),
+    "sleep": (Sleep, ("notes",), 3),
+    "medication": (Medication, ("med_name", "notes"), 4),
+    "vomit": (Vomit, ("vomit_reason",), 5),
+}
+
+# Index rowid = entry id * stride + type code, so triggers can find an
+# entry's index row by rowid instead of scanning
+ROWID_STRIDE = 8
+
+SEARCH_LIMIT = 50
+
+# Highlight markers that can't appear in typed notes; swapped for <mark> after escaping
+HIT_START = "\x02"
+HIT_END = "\x03"
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def body_sql(columns, alias):
+    # Searchable text of one row, as an SQL expression over NEW/OLD/table
+    parts = [f"coalesce({alias}.{col}, '')" for col in columns]
+    return "trim(" + " || ' ' || ".join(parts) + ")"
+
+
+def rowid_sql(code, alias):
+    return f"{alias}.id * {ROWID_STRIDE} + {code}"
+
+
+def search_index_ddl():
+    statements = [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+        f"USING fts5(body, tokenize = 'porter unicode61')"
+    ]
+
+    # Triggers keep the index in step with every write, Core and ORM alike
+    for kind, (model, columns, code) in SEARCH_SOURCES.items():
+        table = model.__tablename__
+        new_body = body_sql(columns, "new")
+
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS search_{table}_insert AFTER INSERT ON {table} "
+            f"WHEN {new_body} <> '' BEGIN "
+            f"INSERT INTO {SEARCH_TABLE}(rowid, body) VALUES ({rowid_sql(code, 'new')}, {new_body}); "
+            f"END",
+
+            f"CREATE TRIGGER IF NOT EXISTS search_{table}_delete AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM {SEARCH_TABLE} WHERE rowid = {rowid_sql(code, 'old')}; "
+            f"END",
+
+            f"CREATE TRIGGER IF NOT EXISTS search_{table}_update "
+            f"AFTER UPDATE OF {', '.join(columns)} ON {table} BEGIN "
+            f"DELETE FROM {SEARCH_TABLE} WHERE rowid = {rowid_sql(code, 'old')}; "
+            f"INSERT INTO {SEARCH_TABLE}(rowid, body) "
+            f"SELECT {rowid_sql(code, 'new')}, {new_body} WHERE {new_body} <> ''; "
+            f"END",
+        ]
+
+    return statements
+
+
+def search_index_exists():
+    return db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": SEARCH_TABLE},
+    ).first() is not None
+
+
+def create_search_index():
+    """
+    Create the FTS5 index and its triggers, filling it on first creation.
+
+    Returns False (and logs) when this SQLite build has no FTS5.
+    """
+    existed = search_index_exists()
+
+    try:
+        for statement in search_index_ddl():
+            db.session.execute(text(statement))
+    except OperationalError as e:
+        db.session.rollback()
+        log.warning("Full-text search disabled: %s", e.orig)
+        return False
+
+    if not existed:
+        fill_search_index()
+
+    db.session.commit()
+    return True
+
+
+def fill_search_index():
+    # Hot and archived entries alike; ids never repeat across the two
+    for kind, (model, columns, code) in SEARCH_SOURCES.items():
+        table = model.__tablename__
+        body = body_sql(columns, "entry")
+        for source in (table, f"{ARCHIVE_SCHEMA}.{table}"):
+            db.session.execute(text(
+                f"INSERT INTO {SEARCH_TABLE}(rowid, body) "
+                f"SELECT {rowid_sql(code, 'entry')}, {body} FROM {source} AS entry WHERE {body} <> ''"
+            ))
+
+
+def reindex_archived_sql(model, source):
+    """
+    SQL re-adding one archived entry (id bound as ?) to the index.
+
+    Moving an entry deletes its hot row, which fires the delete trigger;
+    the archive copy is indexed again from `source`, its table in the
+    archive file.
+    """
+    kind = next(kind for kind, (m, _, _) in SEARCH_SOURCES.items() if m is model)
+    _, columns, code = SEARCH_SOURCES[kind]
+    body = body_sql(columns, "entry")
+    return (
+        f"INSERT INTO main.{SEARCH_TABLE}(rowid, body) "
+        f"SELECT {rowid_sql(code, 'entry')}, {body} FROM {source} AS entry "
+        f"WHERE entry.id = ? AND {body} <> ''"
+    )
+
+
+def rebuild_search_index():
+    db.session.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+    fill_search_index()
+    db.session.commit()
+
+
+def match_query(query):
+    # Plain words -> FTS5 query: every word must match, last one as a prefix
+    words = WORD_RE.findall(query)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def highlight(snippet):
+    return Markup(
+        escape(snippet).replace(HIT_START, "<mark>").replace(HIT_END, "</mark>")
+    )
+
+
+def search_entries(query, limit=SEARCH_LIMIT):
+    """
+    Best-ranked (bm25) entries across every log matching `query`.
+
+    Returns [(type, row, highlighted snippet), ...]; archived rows have
+    `archived` set, like list pages.
+    """
+    match = match_query(query)
+    if match is None:
+        return []
+
+    hits = db.session.execute(
+        text(
+            f"SELECT rowid, snippet({SEARCH_TABLE}, 0, :hit_start, :hit_end, '…', 12) "
+            f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match "
+            f"ORDER BY rank LIMIT :limit"
+        ),
+        {"match": match, "hit_start": HIT_START, "hit_end": HIT_END, "limit": limit},
+    ).all()
+
+    kinds_by_code = {code: kind for kind, (_, _, code) in SEARCH_SOURCES.items()}
+    keys = [(kinds_by_code[rowid % ROWID_STRIDE], rowid // ROWID_STRIDE, snippet) for rowid, snippet in hits]
+
+    # Full rows, one IN query per type and table that matched
+    ids_by_kind = {}
+    for kind, row_id, _ in keys:
+        ids_by_kind.setdefault(kind, []).append(row_id)
+
+    rows_by_key = {}
+    for kind, ids in ids_by_kind.items():
+        for entity, is_archive in log_sources(SEARCH_SOURCES[kind][0]):
+            for row in db.session.query(entity).filter(entity.id.in_(ids)):
+                row.archived = is_archive
+                rows_by_key[(kind, row.id)] = row
+
+    return [
+        (kind, rows_by_key[(kind, row_id)], highlight(snippet))
+        for kind, row_id, snippet in keys
+        if (kind, row_id) in rows_by_key
+    ]
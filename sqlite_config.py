@@ -0,0 +1,48 @@
+import os
+
+from sqlalchemy import event
+
+from models import db
+
+# Defaults favour several devices writing at once on a small NAS
+DEFAULT_JOURNAL_MODE = "WAL"
+DEFAULT_SYNCHRONOUS = "NORMAL"
+DEFAULT_BUSY_TIMEOUT_MS = 5000
+DEFAULT_MMAP_SIZE = 64 * 1024 * 1024
+DEFAULT_CACHE_SIZE_KB = 16 * 1024
+
+
+def build_sqlite_pragmas():
+    journal_mode = os.environ.get("ELI_SQLITE_JOURNAL_MODE", DEFAULT_JOURNAL_MODE)
+    synchronous = os.environ.get("ELI_SQLITE_SYNCHRONOUS", DEFAULT_SYNCHRONOUS)
+    busy_timeout_ms = int(
+        os.environ.get("ELI_SQLITE_BUSY_TIMEOUT_MS", DEFAULT_BUSY_TIMEOUT_MS)
+    )
+    mmap_size = int(os.environ.get("ELI_SQLITE_MMAP_SIZE", DEFAULT_MMAP_SIZE))
+    cache_size_kb = int(
+        os.environ.get("ELI_SQLITE_CACHE_SIZE_KB", DEFAULT_CACHE_SIZE_KB)
+    )
+
+    # Order matters: busy_timeout first so the journal switch can wait on locks
+    return [
+        ("busy_timeout", busy_timeout_ms),
+        ("journal_mode", journal_mode.upper()),
+        ("synchronous", synchronous.upper()),
+        ("mmap_size", mmap_size),
+        # Negative cache_size is in KiB rather than pages
+        ("cache_size", -cache_size_kb),
+        ("temp_store", "MEMORY"),
+    ]
+
+
+def init_sqlite_pragmas(app):
+    pragmas = build_sqlite_pragmas()
+
+    def set_pragmas(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+    with app.app_context():
+        event.listen(db.engine, "connect", set_pragmas)
@@ -0,0 +1,104 @@
+// Patches list pages and the dashboard in place when another device saves
+
+(function () {
+    const tables = (document.body.dataset.liveTables || "").split(",").filter(Boolean);
+    if (!tables.length || !window.EventSource) {
+        return;
+    }
+
+    const POLL_INTERVAL_MS = 5000;
+
+    let refreshTimer = null;
+    let refreshPending = false;
+
+    function scheduleRefresh() {
+        // Collapse a burst of changes (e.g. an offline sync) into one fetch
+        clearTimeout(refreshTimer);
+        refreshTimer = setTimeout(refresh, 300);
+    }
+
+    async function refresh() {
+        if (document.hidden) {
+            refreshPending = true;
+            return;
+        }
+        refreshPending = false;
+
+        // Ask for every card on screen ("See more" included) so none are lost
+        const url = new URL(location.href);
+        const list = document.querySelector("[data-live-patch] > .card")?.parentElement;
+        if (list) {
+            url.searchParams.set("rows", list.querySelectorAll(":scope > .card").length);
+        }
+
+        const response = await fetch(url, { credentials: "same-origin" });
+        if (!response.ok) {
+            return;
+        }
+
+        const page = new DOMParser().parseFromString(await response.text(), "text/html");
+
+        // Swap only the marked parts (cards, range count) so forms keep their input;
+        // pages without marks (dashboard, timeline) swap all of <main>
+        const freshParts = page.querySelectorAll("main [data-live-patch]");
+        const currentParts = document.querySelectorAll("main [data-live-patch]");
+        if (currentParts.length && freshParts.length === currentParts.length) {
+            currentParts.forEach((part, i) => part.replaceWith(freshParts[i]));
+            return;
+        }
+
+        const fresh = page.querySelector("main");
+        const current = document.querySelector("main");
+        if (fresh && current) {
+            current.innerHTML = fresh.innerHTML;
+        }
+    }
+
+    function connect(since) {
+        const source = new EventSource(`/live/events?since=${since}`);
+
+        source.addEventListener("change", (event) => {
+            const change = JSON.parse(event.data);
+            if (tables.includes(change.table)) {
+                scheduleRefresh();
+            }
+        });
+
+        // Missed too much (or the server restarted): just refresh
+        source.addEventListener("reset", scheduleRefresh);
+
+        source.addEventListener("error", () => {
+            // Refused (too many pages open): the browser won't retry by itself
+            if (source.readyState === EventSource.CLOSED) {
+                pollVersions(null);
+            }
+        });
+    }
+
+    async function pollVersions(seen) {
+        // Stream fallback: compare table versions every few seconds
+        let versions = seen;
+        try {
+            const response = await fetch(`/live/versions?tables=${tables.join(",")}`, {
+                credentials: "same-origin",
+            });
+            if (response.ok) {
+                versions = await response.text();
+                if (seen !== null && versions !== seen) {
+                    scheduleRefresh();
+                }
+            }
+        } catch (error) {
+            // Offline; try again next round
+        }
+        setTimeout(() => pollVersions(versions), POLL_INTERVAL_MS);
+    }
+
+    document.addEventListener("visibilitychange", () => {
+        if (!document.hidden && refreshPending) {
+            refresh();
+        }
+    });
+
+    connect(document.body.dataset.liveSince || "");
+})();
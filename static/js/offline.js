@@ -0,0 +1,52 @@
+// Registers the service worker and reports offline saves/syncs in the toast
+
+(function () {
+    if (!("serviceWorker" in navigator)) {
+        return;
+    }
+
+    function showToast(text) {
+        const toast = document.getElementById("toast");
+        if (!toast) {
+            return;
+        }
+        toast.textContent = text;
+        toast.style.opacity = "1";
+        setTimeout(() => {
+            toast.style.opacity = "0";
+        }, 3000);
+    }
+
+    function requestFlush() {
+        navigator.serviceWorker.ready.then((registration) => {
+            if (registration.active) {
+                registration.active.postMessage({ type: "flush" });
+            }
+        });
+    }
+
+    navigator.serviceWorker.register("/sw.js", { scope: "/" });
+
+    navigator.serviceWorker.addEventListener("message", (event) => {
+        const data = event.data || {};
+        if (data.type === "synced" && data.created) {
+            let text = `Synced ${data.created} offline ${data.created === 1 ? "entry" : "entries"}.`;
+            if (data.rejected) {
+                text += ` ${data.rejected} could not be saved.`;
+            }
+            showToast(text);
+        }
+    });
+
+    window.addEventListener("DOMContentLoaded", () => {
+        if (new URLSearchParams(location.search).has("offline")) {
+            showToast("Saved offline. It will sync when back online.");
+        }
+    });
+
+    // Replay anything queued as soon as we can reach the server
+    window.addEventListener("online", requestFlush);
+    if (navigator.onLine) {
+        requestFlush();
+    }
+})();
@@ -0,0 +1,42 @@
+// "See more" on list pages: fetch only the next cards and append them in place
+
+(function () {
+    if (!window.fetch) {
+        return;
+    }
+
+    async function loadMore(container, link) {
+        const url = new URL(link.href);
+        url.searchParams.set("fragment", "1");
+
+        link.classList.add("disabled");
+        try {
+            const response = await fetch(url, { credentials: "same-origin" });
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+
+            // The fragment is the new cards plus the next "See more" (if any)
+            const template = document.createElement("template");
+            template.innerHTML = await response.text();
+            container.replaceWith(template.content);
+        } catch (err) {
+            // Offline or server error: fall back to a full page load
+            window.location.href = link.href;
+        }
+    }
+
+    // Delegated, since live updates swap the list's markup
+    document.addEventListener("click", (event) => {
+        const link = event.target.closest("[data-see-more] a");
+        if (!link || event.defaultPrevented || event.button !== 0 ||
+            event.metaKey || event.ctrlKey || event.shiftKey || event.altKey) {
+            return;
+        }
+
+        event.preventDefault();
+        if (!link.classList.contains("disabled")) {
+            loadMore(link.closest("[data-see-more]"), link);
+        }
+    });
+})();
@@ -0,0 +1,19 @@
+// Ticks the running feed/sleep timers on the dashboard
+
+(function () {
+    function pad(n) {
+        return String(n).padStart(2, "0");
+    }
+
+    function tick() {
+        // Looked up every tick, since live updates swap the dashboard's markup
+        const now = Date.now();
+        document.querySelectorAll("[data-timer-start]").forEach((el) => {
+            const seconds = Math.max(0, Math.floor((now - Number(el.dataset.timerStart)) / 1000));
+            const hours = Math.floor(seconds / 3600);
+            el.textContent = `${pad(hours)}:${pad(Math.floor(seconds / 60) % 60)}:${pad(seconds % 60)}`;
+        });
+    }
+
+    setInterval(tick, 1000);
+})();
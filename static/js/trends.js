@@ -0,0 +1,88 @@
+// Draws the trends page bar charts from /api/stats as inline SVG
+
+(function () {
+    const container = document.getElementById("trend-charts");
+    if (!container) {
+        return;
+    }
+
+    const SVG_NS = "http://www.w3.org/2000/svg";
+    const WIDTH = 600;
+    const HEIGHT = 140;
+    const LABEL_HEIGHT = 16;
+
+    function svgElement(name, attrs) {
+        const el = document.createElementNS(SVG_NS, name);
+        Object.entries(attrs).forEach(([key, value]) => el.setAttribute(key, value));
+        return el;
+    }
+
+    function formatValue(value, unit) {
+        if (value === null) {
+            return "–";
+        }
+        return unit ? `${value} ${unit}` : `${value}`;
+    }
+
+    function drawChart(target, buckets, values, unit) {
+        const max = Math.max(1, ...values.filter((v) => v !== null));
+        const slot = WIDTH / buckets.length;
+        const barWidth = Math.max(1, slot * 0.7);
+        const plotHeight = HEIGHT - LABEL_HEIGHT;
+
+        const svg = svgElement("svg", {
+            viewBox: `0 0 ${WIDTH} ${HEIGHT}`,
+            width: "100%",
+            role: "img",
+        });
+
+        values.forEach((value, i) => {
+            if (value === null) {
+                return;
+            }
+            const height = (value / max) * (plotHeight - 4);
+            const bar = svgElement("rect", {
+                x: i * slot + (slot - barWidth) / 2,
+                y: plotHeight - height,
+                width: barWidth,
+                height: height,
+                rx: 2,
+                fill: "var(--app-accent)",
+            });
+            const title = svgElement("title", {});
+            title.textContent = `${buckets[i]}: ${formatValue(value, unit)}`;
+            bar.appendChild(title);
+            svg.appendChild(bar);
+        });
+
+        // First and last bucket dates under the axis
+        [[0, "start"], [buckets.length - 1, "end"]].forEach(([i, anchor]) => {
+            const label = svgElement("text", {
+                x: anchor === "start" ? 0 : WIDTH,
+                y: HEIGHT - 2,
+                "text-anchor": anchor,
+                "font-size": 11,
+                fill: "currentColor",
+            });
+            label.textContent = buckets[i];
+            svg.appendChild(label);
+        });
+
+        target.replaceChildren(svg);
+    }
+
+    fetch(container.dataset.statsUrl, { credentials: "same-origin" })
+        .then((response) => response.json())
+        .then((data) => {
+            container.querySelectorAll(".trend-chart").forEach((target) => {
+                const name = target.dataset.series;
+                const values = data.series[name] || [];
+                drawChart(target, data.buckets, values, target.dataset.unit);
+
+                const latest = container.querySelector(`.trend-latest[data-series="${name}"]`);
+                if (latest && values.length) {
+                    latest.textContent = formatValue(values[values.length - 1], target.dataset.unit);
+                }
+            });
+        });
+})();
@@ -0,0 +1,168 @@
+from datetime import date, datetime, time, timedelta
+import random
+
+from bulk_import import import_records
+
+# Round-the-clock schedule of a tube-fed infant, roughly
+FEEDS_PER_DAY = 8
+DIAPERS_PER_DAY = 8
+BM_CHANCE = 0.35
+NAPS_PER_DAY = 6
+VOMITS_PER_DAY = 0.4
+
+# (name, dose mL, hours given)
+MEDICATIONS = [
+    ("Famotidine", 0.5, (8, 20)),
+    ("Vitamin D", 1.0, (9,)),
+    ("Glycopyrrolate", 0.8, (6, 14, 22)),
+]
+
+CAREGIVERS = ["MR", "JT", "AK", "SN"]
+NOTES = ["", "", "", "", "fussy", "slept through", "tolerated well", "pump alarm", "trach care"]
+
+
+def minutes_later(day, start, minutes):
+    # (date, time) `minutes` after `start`; the session may end after midnight
+    end = datetime.combine(day, start) + timedelta(minutes=minutes)
+    return end.time().replace(second=0, microsecond=0)
+
+
+def feed_records(rng, day):
+    for feed_num in range(1, FEEDS_PER_DAY + 1):
+        start = time((feed_num - 1) * 3, rng.randrange(0, 30))
+        duration = rng.randint(20, 55)
+        yield {
+            "date": day.isoformat(),
+            # Blank, like the new-feed form; numbered on import
+            "feed_num": "",
+            "start_time": start.strftime("%H:%M"),
+            "end_time": minutes_later(day, start, duration).strftime("%H:%M"),
+            "feed_vol_ml": rng.randint(45, 120),
+            "feed_rate": rng.choice([90, 100, 110, 120, 130, 140]),
+            "notes": rng.choice(NOTES),
+        }
+
+
+def diaper_records(rng, day):
+    for i in range(DIAPERS_PER_DAY):
+        dt = datetime.combine(day, time(i * 3)) + timedelta(minutes=rng.randint(30, 170))
+        bm = rng.random() < BM_CHANCE
+        yield {
+            "dt": dt.isoformat(timespec="minutes"),
+            "wet_diaper_size": rng.choice(["S", "M", "M", "L"]) if not bm or rng.random() < 0.7 else "",
+            "bm_diaper_size": rng.choice(["S", "M", "L"]) if bm else "",
+            "notes": rng.choice(NOTES),
+        }
+
+
+def sleep_records(rng, day):
+    slot_minutes = 24 * 60 // NAPS_PER_DAY
+    for i in range(NAPS_PER_DAY):
+        start_dt = datetime.combine(day, time()) + timedelta(
+            minutes=i * slot_minutes + rng.randint(0, 60)
+        )
+        duration = rng.randint(30, slot_minutes - 60)
+        yield {
+            "date": day.isoformat(),
+            "start_time": start_dt.strftime("%H:%M"),
+            "end_time": minutes_later(day, start_dt.time(), duration).strftime("%H:%M"),
+            "notes": rng.choice(NOTES),
+        }
+
+
+def medication_records(rng, day):
+    for name, dose, hours in MEDICATIONS:
+        for hour in hours:
+            dt = datetime.combine(day, time(hour, rng.randint(0, 20)))
+            yield {
+                "dt": dt.isoformat(timespec="minutes"),
+                "med_name": name,
+                "dosage_ml": dose,
+                "initials": rng.choice(CAREGIVERS),
+                "notes": rng.choice(NOTES),
+            }
+
+
+def vomit_records(rng, day):
+    count = sum(rng.random() < VOMITS_PER_DAY / 2 for _ in range(2))
+    for _ in range(count):
+        dt = datetime.combine(day, time()) + timedelta(minutes=rng.randint(0, 24 * 60 - 1))
+        yield {
+            "dt": dt.isoformat(timespec="minutes"),
+            "vomit_size": rng.choice(["S", "S", "M", "L"]),
+            "feed_rate": rng.choice(["", 100, 120, 140]),
+            "vomit_reason": rng.choice(["", "", "coughing", "after feed", "reflux"]),
+        }
+
+
+def started_at(record):
+    if "dt" in record:
+        return datetime.fromisoformat(record["dt"])
+    return datetime.combine(
+        date.fromisoformat(record["date"]), time.fromisoformat(record["start_time"])
+    )
+
+
+def as_of(record, now):
+    """
+    The record as it would stand at `now`: None if it hasn't happened yet,
+    and a feed or sleep still under way has no end time yet.
+    """
+    start = started_at(record)
+    if start > now:
+        return None
+
+    if record.get("end_time"):
+        end = datetime.combine(start.date(), time.fromisoformat(record["end_time"]))
+        if end <= start:
+            end += timedelta(days=1)
+        if end > now:
+            record = {**record, "end_time": ""}
+
+    return record
+
+
+GENERATORS = {
+    "diaper": diaper_records,
+    "feed": feed_records,
+    "sleep": sleep_records,
+    "medication": medication_records,
+    "vomit": vomit_records,
+}
+
+
+def generate_synthetic_data(days, seed=0, end_day=None):
+    """
+    Fill every log with `days` of realistic round-the-clock entries.
+
+    The same seed always produces the same rows, except that nothing after
+    the current time is generated: on today only entries so far appear.
+    Rows go through bulk import, so daily_stats, derived columns and table
+    versions stay consistent. Returns {log name: rows inserted}.
+    """
+    now = datetime.now()
+    end_day = end_day or now.date()
+    first_day = end_day - timedelta(days=days - 1)
+    counts = {}
+
+    for log_name, make_records in GENERATORS.items():
+        # Separate stream per log, so adding a log doesn't reshuffle the others
+        rng = random.Random(f"{seed}:{log_name}")
+
+        def records():
+            line_no = 0
+            for offset in range(days):
+                for record in make_records(rng, first_day + timedelta(days=offset)):
+                    record = as_of(record, now)
+                    if record is None:
+                        continue
+                    line_no += 1
+                    yield line_no, record
+
+        result = import_records(log_name, records())
+        if result["errors"]:
+            line_no, message = result["errors"][0]
+            raise ValueError(f"Generated {log_name} row {line_no} is invalid: {message}")
+        counts[log_name] = result["inserted"]
+
+    return counts
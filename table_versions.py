@@ -0,0 +1,106 @@
+from collections import Counter
+from datetime import datetime, timezone
+from itertools import chain
+import threading
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import db, TableVersion
+
+# Bumps this process has committed, per table, until take_committed_bumps()
+_committed_bumps = Counter()
+_committed_bumps_lock = threading.Lock()
+
+
+def utc_now():
+    # Stored naive; table_versions.updated_at is always UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def bump_table_versions(conn, table_names):
+    """
+    Increment the change version of each table on `conn` (same transaction).
+
+    `conn` must be db.session's connection; the bumps count as this
+    process's own once the session commits.
+    """
+    if not table_names:
+        return
+
+    db.session.info.setdefault("bumped_tables", Counter()).update(table_names)
+
+    now = utc_now()
+    stmt = sqlite_insert(TableVersion)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TableVersion.table_name],
+        set_={
+            "version": TableVersion.version + 1,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    conn.execute(
+        stmt,
+        [
+            {"table_name": name, "version": 1, "updated_at": now}
+            for name in sorted(table_names)
+        ],
+    )
+
+
+def read_table_versions(table_names):
+    """
+    {table_name: (version, updated_at)} for the given tables, in one query.
+
+    Tables never written since versioning started read as (0, None).
+    """
+    versions = dict.fromkeys(table_names, (0, None))
+
+    rows = db.session.execute(
+        select(
+            TableVersion.table_name,
+            TableVersion.version,
+            TableVersion.updated_at,
+        ).where(TableVersion.table_name.in_(table_names))
+    )
+    for name, version, updated_at in rows:
+        versions[name] = (version, updated_at)
+
+    return versions
+
+
+@event.listens_for(db.session, "after_flush")
+def bump_flushed_tables(session, flush_context):
+    # new/dirty/deleted still hold the pre-flush state here
+    tables = {
+        obj.__table__.name
+        for obj in chain(session.new, session.dirty, session.deleted)
+        if obj in session.new or obj in session.deleted or session.is_modified(obj)
+    }
+    tables.discard(TableVersion.__tablename__)
+
+    bump_table_versions(session.connection(), tables)
+
+
+def take_committed_bumps():
+    """
+    {table_name: bumps} committed by this process since the last call.
+    """
+    global _committed_bumps
+
+    with _committed_bumps_lock:
+        bumps, _committed_bumps = _committed_bumps, Counter()
+    return bumps
+
+
+@event.listens_for(db.session, "after_commit")
+def count_committed_bumps(session):
+    bumps = session.info.pop("bumped_tables", None)
+    if bumps:
+        with _committed_bumps_lock:
+            _committed_bumps.update(bumps)
+
+
+@event.listens_for(db.session, "after_rollback")
+def drop_rolled_back_bumps(session):
+    session.info.pop("bumped_tables", None)
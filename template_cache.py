@@ -0,0 +1,33 @@
+import logging
+import os
+import tempfile
+
+from jinja2 import FileSystemBytecodeCache
+
+log = logging.getLogger(__name__)
+
+
+def template_cache_dir():
+    default_dir = os.path.join(tempfile.gettempdir(), "eli-care-log-jinja")
+    path = os.environ.get("ELI_TEMPLATE_CACHE_DIR", default_dir)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def init_template_cache(app):
+    """
+    Keep compiled templates on disk and compile every template at boot.
+
+    Cache entries are keyed by template source checksum, so an edited
+    template is simply recompiled. With gunicorn's preload_app the warm-up
+    runs once in the master and every forked worker inherits the result.
+    """
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(template_cache_dir())
+    warm_templates(app)
+
+
+def warm_templates(app):
+    names = app.jinja_env.list_templates()
+    for name in names:
+        app.jinja_env.get_template(name)
+    log.info("Compiled %d templates", len(names))
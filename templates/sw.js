@@ -0,0 +1,198 @@
+// Service worker: offline app shell + queued writes (see routes/offline_routes.py)
+
+const CACHE_NAME = "eli-shell-{{ cache_version }}";
+const PRECACHE = {{ precache|tojson }};
+const LOG_NAMES = {{ log_names|tojson }};
+const MAX_BATCH = {{ max_entries }};
+
+const DB_NAME = "eli-offline";
+const OUTBOX = "outbox";
+const SYNC_TAG = "eli-outbox";
+
+// ---------- App shell ----------
+
+self.addEventListener("install", (event) => {
+    event.waitUntil(
+        caches.open(CACHE_NAME)
+            .then((cache) => cache.addAll(PRECACHE))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener("activate", (event) => {
+    // Drop caches from older asset versions
+    event.waitUntil(
+        caches.keys()
+            .then((names) => Promise.all(
+                names
+                    .filter((name) => name.startsWith("eli-shell-") && name !== CACHE_NAME)
+                    .map((name) => caches.delete(name))
+            ))
+            .then(() => self.clients.claim())
+            .then(() => flushOutbox().catch(() => {}))
+    );
+});
+
+self.addEventListener("fetch", (event) => {
+    const request = event.request;
+    const url = new URL(request.url);
+
+    if (url.origin !== self.location.origin) {
+        return;
+    }
+
+    // Offline-capable "new entry" submissions
+    const logName = newEntryLog(url);
+    if (request.method === "POST" && logName) {
+        event.respondWith(submitOrQueue(request, logName));
+        return;
+    }
+
+    if (request.method !== "GET") {
+        return;
+    }
+
+    // Fingerprinted files never change: cache first
+    if (url.pathname.startsWith("/assets/")) {
+        event.respondWith(
+            caches.match(request).then((cached) => cached || fetch(request))
+        );
+        return;
+    }
+
+    // Pages: network first, cached copy when offline
+    if (request.mode === "navigate") {
+        event.respondWith(networkFirst(request, url));
+    }
+});
+
+function newEntryLog(url) {
+    const match = url.pathname.match(/^\/([a-z]+)\/new$/);
+    return match && LOG_NAMES.includes(match[1]) ? match[1] : null;
+}
+
+async function networkFirst(request, url) {
+    try {
+        const response = await fetch(request);
+        if (response.ok && !url.search && PRECACHE.includes(url.pathname)) {
+            const cache = await caches.open(CACHE_NAME);
+            await cache.put(request, response.clone());
+        }
+        return response;
+    } catch (err) {
+        const cached = await caches.match(request, { ignoreSearch: true });
+        return cached || Response.error();
+    }
+}
+
+async function submitOrQueue(request, logName) {
+    const body = await request.clone().formData();
+
+    try {
+        return await fetch(request);
+    } catch (err) {
+        // Offline: keep the entry and send it later
+        await queueEntry({
+            key: crypto.randomUUID(),
+            log: logName,
+            fields: Object.fromEntries(body.entries()),
+            queued_at: new Date().toISOString(),
+        });
+
+        if (self.registration.sync) {
+            self.registration.sync.register(SYNC_TAG).catch(() => {});
+        }
+
+        return Response.redirect(`/${logName}?offline=1`, 303);
+    }
+}
+
+// ---------- Outbox (IndexedDB) ----------
+
+function openOutbox() {
+    return new Promise((resolve, reject) => {
+        const req = indexedDB.open(DB_NAME, 1);
+        req.onupgradeneeded = () => req.result.createObjectStore(OUTBOX, { keyPath: "key" });
+        req.onsuccess = () => resolve(req.result);
+        req.onerror = () => reject(req.error);
+    });
+}
+
+function outboxTransaction(mode, work) {
+    return openOutbox().then((db) => new Promise((resolve, reject) => {
+        const tx = db.transaction(OUTBOX, mode);
+        const req = work(tx.objectStore(OUTBOX));
+        tx.oncomplete = () => resolve(req ? req.result : undefined);
+        tx.onerror = () => reject(tx.error);
+    }));
+}
+
+function queueEntry(entry) {
+    return outboxTransaction("readwrite", (store) => store.put(entry));
+}
+
+function queuedEntries() {
+    return outboxTransaction("readonly", (store) => store.getAll());
+}
+
+function removeEntries(keys) {
+    return outboxTransaction("readwrite", (store) => {
+        keys.forEach((key) => store.delete(key));
+    });
+}
+
+let flushing = null;
+
+function flushOutbox() {
+    // One replay at a time; callers share the running one
+    if (!flushing) {
+        flushing = replayOutbox().finally(() => { flushing = null; });
+    }
+    return flushing;
+}
+
+async function replayOutbox() {
+    const queued = await queuedEntries();
+    const entries = queued.slice(0, MAX_BATCH);
+    if (!entries.length) {
+        return;
+    }
+
+    const response = await fetch("/api/ingest", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ entries }),
+    });
+    if (!response.ok) {
+        // Keep everything queued; the next sync or page load retries
+        throw new Error(`Ingest failed with ${response.status}`);
+    }
+
+    const { results } = await response.json();
+
+    // Created, duplicate and rejected entries are all settled
+    await removeEntries(results.map((result) => result.key).filter(Boolean));
+
+    const created = results.filter((result) => result.status === "created").length;
+    const rejected = results.filter((result) => result.status === "rejected").length;
+
+    const clients = await self.clients.matchAll({ type: "window" });
+    clients.forEach((client) => client.postMessage({ type: "synced", created, rejected }));
+
+    // Large backlogs go up in several batches
+    if (queued.length > entries.length) {
+        await replayOutbox();
+    }
+}
+
+self.addEventListener("sync", (event) => {
+    if (event.tag === SYNC_TAG) {
+        event.waitUntil(flushOutbox());
+    }
+});
+
+self.addEventListener("message", (event) => {
+    if (event.data && event.data.type === "flush") {
+        event.waitUntil(flushOutbox().catch(() => {}));
+    }
+});
@@ -0,0 +1,19 @@
+import pytest
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # Fresh database (and archive file) per test
+    monkeypatch.setenv("ELI_DB_DIR", str(tmp_path / "db"))
+    monkeypatch.setenv("ELI_TEMPLATE_CACHE_DIR", str(tmp_path / "jinja"))
+
+    from app import create_app
+
+    app = create_app()
+    app.config["TESTING"] = True
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,38 @@
+from datetime import date, datetime, time
+
+from active_sessions import active_sessions, stop_session
+from models import db, DailyStat, Sleep
+
+
+def start_sleep(day, start_time):
+    row = Sleep()
+    row.set_times(day, start_time, None)
+    db.session.add(row)
+    db.session.commit()
+    return row.id
+
+
+def test_stop_across_midnight(app):
+    with app.app_context():
+        sleep_id = start_sleep(date(2026, 1, 5), time(22, 30))
+
+        # Counted on the day it started, like every sleep
+        assert stop_session(Sleep, sleep_id, now=datetime(2026, 1, 6, 1, 15)) == (date(2026, 1, 5), 165)
+
+        row = db.session.get(Sleep, sleep_id)
+        assert (row.end_time, row.end_dt) == (time(1, 15), datetime(2026, 1, 6, 1, 15))
+        assert db.session.get(DailyStat, date(2026, 1, 5)).sleep_min == 165
+        assert active_sessions() == []
+
+
+def test_stop_twice(app):
+    with app.app_context():
+        sleep_id = start_sleep(date(2026, 1, 5), time(13, 0))
+        assert stop_session(Sleep, sleep_id, now=datetime(2026, 1, 5, 14, 0)) == (date(2026, 1, 5), 60)
+
+        # Already stopped: nothing changes, the first end and duration stay
+        assert stop_session(Sleep, sleep_id, now=datetime(2026, 1, 5, 15, 0)) is None
+
+        row = db.session.get(Sleep, sleep_id)
+        assert (row.end_time, row.sleep_duration_min) == (time(14, 0), 60)
+        assert db.session.get(DailyStat, date(2026, 1, 5)).sleep_min == 60
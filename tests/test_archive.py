@@ -0,0 +1,102 @@
+from datetime import date, datetime, time
+import os
+
+from archive import archive_entries, archived
+from models import db, Diaper, Feed
+from search import rebuild_search_index, search_entries
+
+
+def test_ids_not_reused_after_archiving(app):
+    with app.app_context():
+        db.session.add_all([
+            Diaper(dt=datetime(2025, 1, 1, 8), wet_diaper_size="S"),
+            Diaper(dt=datetime(2025, 1, 2, 8), wet_diaper_size="M"),
+        ])
+        db.session.commit()
+
+        assert archive_entries(older_than_days=30) == {"diapers": 2}
+
+        row = Diaper(dt=datetime.now(), wet_diaper_size="L")
+        db.session.add(row)
+        db.session.commit()
+
+        archived_ids = {entry.id for entry in db.session.query(archived(Diaper))}
+        assert archived_ids == {1, 2}
+        assert row.id == 3
+
+        # Already moved: a second run copies and deletes nothing
+        assert archive_entries(older_than_days=30) == {}
+
+
+def test_backdated_feed_skips_archived_numbers(app, client):
+    with app.app_context():
+        db.session.add(Feed(date=date(2025, 1, 1), feed_num=1, start_time=time(8, 0)))
+        db.session.add(Feed(date=date.today(), feed_num=1, start_time=time(8, 0)))
+        db.session.commit()
+        assert archive_entries(older_than_days=30) == {"feed": 1}
+
+    form = {"date": "2025-01-01", "start_time": "11:00", "end_time": "", "feed_vol_ml": "", "feed_rate": ""}
+    assert client.post("/feed/new", data=form).status_code == 302
+
+    with app.app_context():
+        assert Feed.query.filter(Feed.date == date(2025, 1, 1)).one().feed_num == 2
+
+        # The next move must not collide with the archived feed #1
+        assert archive_entries(older_than_days=30) == {"feed": 1}
+
+
+def test_backup_runs_when_archiving_fails(app, monkeypatch, tmp_path):
+    import backup
+
+    def broken_archive():
+        raise RuntimeError("archive is broken")
+
+    monkeypatch.setenv("ELI_BACKUP_DIR", str(tmp_path / "backups"))
+    monkeypatch.setattr(backup, "ARCHIVE_AFTER_DAYS", 30)
+    monkeypatch.setattr(backup, "archive_entries", broken_archive)
+
+    with app.app_context():
+        path = backup.run_backup()
+
+    assert path and os.path.exists(path)
+
+
+def test_restore_keeps_ids_past_the_archive(app, monkeypatch, tmp_path):
+    import backup
+
+    monkeypatch.setenv("ELI_BACKUP_DIR", str(tmp_path / "backups"))
+
+    with app.app_context():
+        db.session.add(Diaper(dt=datetime(2025, 1, 1, 8), wet_diaper_size="S"))
+        db.session.commit()
+        snapshot = backup.run_backup()
+
+        # Added and archived after the snapshot, so its sequence is behind
+        db.session.add(Diaper(dt=datetime(2025, 1, 2, 8), wet_diaper_size="M"))
+        db.session.commit()
+        assert archive_entries(older_than_days=30) == {"diapers": 2}
+        backup.restore_backup(snapshot)
+
+        row = Diaper(dt=datetime.now(), wet_diaper_size="L")
+        db.session.add(row)
+        db.session.commit()
+        assert row.id == 3
+
+
+def test_archived_entries_stay_searchable(app, client):
+    with app.app_context():
+        db.session.add(Diaper(dt=datetime(2025, 1, 1, 8), wet_diaper_size="S", notes="fussy after bath"))
+        db.session.add(Diaper(dt=datetime.now(), wet_diaper_size="M", notes="fussy again"))
+        db.session.commit()
+        assert archive_entries(older_than_days=30) == {"diapers": 1}
+
+        results = search_entries("fussy")
+        assert sorted(row.archived for _, row, _ in results) == [False, True]
+
+        # A full rebuild reads the archive too
+        rebuild_search_index()
+        assert len(search_entries("fussy")) == 2
+
+    response = client.get("/search?q=fussy")
+    assert response.status_code == 200
+    assert b"fussy after bath" in response.data.replace(b"<mark>", b"").replace(b"</mark>", b"")
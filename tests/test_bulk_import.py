@@ -0,0 +1,44 @@
+from datetime import date
+
+import bulk_import
+from bulk_import import import_records
+from models import db, DailyStat, Diaper, Feed
+
+
+def test_bad_rows_are_reported_between_batches(app, monkeypatch):
+    monkeypatch.setattr(bulk_import, "IMPORT_BATCH_SIZE", 2)
+
+    records = list(enumerate([
+        {"dt": "2026-01-05T08:00", "wet_diaper_size": "S"},
+        {"dt": "not a date", "wet_diaper_size": "S"},
+        {"dt": "2026-01-05T09:00", "bm_diaper_size": "M"},
+        {"dt": "2026-01-05T10:00", "wet_diaper_size": "XL"},
+        ["not", "an", "object"],
+        {"dt": "2026-01-06T08:00", "wet_diaper_size": "L"},
+    ], start=2))
+
+    with app.app_context():
+        result = import_records("diaper", records)
+
+        assert result["inserted"] == 3
+        assert [line_no for line_no, _ in result["errors"]] == [3, 5, 6]
+        assert Diaper.query.count() == 3
+
+        # Counters cover exactly the rows that went in
+        stats = {row.date: (row.wet_diapers, row.bm_diapers) for row in DailyStat.query}
+        assert stats == {date(2026, 1, 5): (1, 1), date(2026, 1, 6): (1, 0)}
+
+
+def test_feed_numbers_checked_within_the_file(app):
+    records = list(enumerate([
+        {"date": "2026-01-05", "feed_num": "1", "start_time": "08:00"},
+        {"date": "2026-01-05", "feed_num": "1", "start_time": "09:00"},
+        {"date": "2026-01-05", "start_time": "10:00"},
+    ], start=2))
+
+    with app.app_context():
+        result = import_records("feed", records)
+
+        assert result["inserted"] == 2
+        assert result["errors"] == [(3, "Feed #1 already exists on 2026-01-05")]
+        assert sorted(feed.feed_num for feed in Feed.query) == [1, 2]
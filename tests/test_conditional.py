@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from models import db, Diaper, Vomit
+
+
+def test_diaper_list_revalidates_against_writes(app, client):
+    etag = client.get("/diaper").headers["ETag"]
+
+    response = client.get("/diaper", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+
+    # Writes to other logs don't touch this page
+    with app.app_context():
+        db.session.add(Vomit(dt=datetime(2026, 1, 5, 8), vomit_size="S"))
+        db.session.commit()
+    assert client.get("/diaper", headers={"If-None-Match": etag}).status_code == 304
+
+    with app.app_context():
+        db.session.add(Diaper(dt=datetime(2026, 1, 5, 9), wet_diaper_size="S"))
+        db.session.commit()
+
+    response = client.get("/diaper", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from daily_stats import rebuild_daily_stats
+from dashboard_stats import get_dashboard_snapshot
+from models import db, Diaper
+from table_versions import bump_table_versions
+
+
+def test_snapshot_follows_writes_from_other_processes(app):
+    with app.app_context():
+        assert get_dashboard_snapshot()["last_diaper"] is None
+
+        # What another worker's write leaves behind: the row plus a version bump,
+        # with no in-process invalidation
+        dt = datetime.now().replace(microsecond=0)
+        db.session.execute(db.insert(Diaper).values(dt=dt, wet_diaper_size="S"))
+        bump_table_versions(db.session.connection(), ["diapers"])
+        db.session.commit()
+
+        assert get_dashboard_snapshot()["last_diaper"].dt == dt
+
+
+def test_rebuilt_daily_stats_refresh_the_dashboard(app, client):
+    with app.app_context():
+        # A row whose counters never made it into daily_stats
+        db.session.execute(db.insert(Diaper).values(dt=datetime.now(), wet_diaper_size="S"))
+        bump_table_versions(db.session.connection(), ["diapers"])
+        db.session.commit()
+        assert get_dashboard_snapshot()["wet_count"] == 0
+
+    etag = client.get("/").headers["ETag"]
+
+    with app.app_context():
+        rebuild_daily_stats()
+        assert get_dashboard_snapshot()["wet_count"] == 1
+
+    assert client.get("/", headers={"If-None-Match": etag}).status_code == 200
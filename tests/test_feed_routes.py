@@ -0,0 +1,19 @@
+import re
+
+from models import Feed
+
+
+def test_new_feed_form_saves(app, client):
+    # Post back exactly the named inputs the new-feed page renders
+    page = client.get("/feed/new").get_data(as_text=True)
+    names = re.findall(r'name="([a-z_]+)"', page)
+    values = {"date": "2026-01-05", "start_time": "08:30", "end_time": "09:00", "feed_vol_ml": "60"}
+    form = {name: values.get(name, "") for name in names}
+
+    response = client.post("/feed/new", data=form)
+
+    assert response.status_code == 302
+    with app.app_context():
+        row = Feed.query.one()
+        assert row.feed_num == 1
+        assert row.feed_duration_min == 30
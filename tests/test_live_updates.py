@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from live_updates import foreign_changes
+from models import db, Diaper
+from table_versions import read_table_versions, take_committed_bumps
+
+
+def test_poller_skips_own_writes(app):
+    with app.app_context():
+        seen = read_table_versions(["diapers", "feed"])
+        take_committed_bumps()
+
+        db.session.add(Diaper(dt=datetime.now(), wet_diaper_size="S"))
+        db.session.commit()
+
+        versions = read_table_versions(["diapers", "feed"])
+        assert foreign_changes(seen, versions, take_committed_bumps()) == []
+
+        # Another process wrote: the version moved with no bump of ours
+        assert foreign_changes(seen, versions, {}) == [
+            {"table": "diapers", "id": None, "action": "change"}
+        ]
+
+
+def test_poller_announces_restored_versions():
+    seen = {"diapers": (5, None)}
+    assert foreign_changes(seen, {"diapers": (2, None)}, {}) == [
+        {"table": "diapers", "id": None, "action": "change"}
+    ]
+
+
+def test_live_versions(client):
+    assert client.get("/live/versions?tables=diapers,users").get_json() == {"diapers": 0}
+
+    client.post("/diaper/new", data={"dt": "2025-01-01T08:00", "wet_diaper_size": "S", "bm_diaper_size": ""})
+    assert client.get("/live/versions?tables=diapers").get_json() == {"diapers": 1}
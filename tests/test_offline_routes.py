@@ -0,0 +1,49 @@
+import sqlite3
+
+import routes.offline_routes as offline_routes
+from models import db, Diaper, IngestKey
+
+
+def diaper_entry(key, dt="2026-01-05T08:00"):
+    return {"key": key, "log": "diaper", "fields": {"dt": dt, "wet_diaper_size": "S"}}
+
+
+def test_replayed_entries_are_stored_once(app, client):
+    batch = [diaper_entry("a"), diaper_entry("b"), diaper_entry("a")]
+    statuses = [r["status"] for r in client.post("/api/ingest", json={"entries": batch}).get_json()["results"]]
+    assert statuses == ["created", "created", "duplicate"]
+
+    # The whole batch again, as a client that never saw the response would send it
+    statuses = [r["status"] for r in client.post("/api/ingest", json={"entries": batch}).get_json()["results"]]
+    assert statuses == ["duplicate", "duplicate", "duplicate"]
+
+    with app.app_context():
+        assert Diaper.query.count() == 2
+        assert IngestKey.query.count() == 2
+
+
+def test_racing_replay_gets_409(app, client, monkeypatch):
+    with app.app_context():
+        path = db.engine.url.database
+
+    parse_entry = offline_routes.parse_entry
+
+    def parse_while_another_replay_commits(entry):
+        # Another worker stores the same key after this batch looked keys up
+        conn = sqlite3.connect(path)
+        with conn:
+            conn.execute(
+                "INSERT INTO ingest_keys (key, log_name, row_id, created_at) "
+                "VALUES (?, 'diaper', 1, '2026-01-05 08:00:00')",
+                (entry["key"],),
+            )
+        conn.close()
+        return parse_entry(entry)
+
+    monkeypatch.setattr(offline_routes, "parse_entry", parse_while_another_replay_commits)
+
+    response = client.post("/api/ingest", json={"entries": [diaper_entry("a")]})
+    assert response.status_code == 409
+
+    with app.app_context():
+        assert Diaper.query.count() == 0
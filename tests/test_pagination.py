@@ -0,0 +1,42 @@
+from datetime import date, datetime, time, timedelta
+import re
+
+from models import db, Diaper, Feed
+
+
+def test_rows_param_renders_every_loaded_card(app, client):
+    with app.app_context():
+        start = datetime(2026, 1, 5, 8)
+        db.session.add_all([Diaper(dt=start + timedelta(hours=i), wet_diaper_size="S") for i in range(12)])
+        db.session.commit()
+
+    def card_count(url):
+        return client.get(url).get_data(as_text=True).count('class="card shadow-sm')
+
+    assert card_count("/diaper") == 5
+
+    # Live refresh after two "See more" clicks asks for all 11 cards at once
+    page = client.get("/diaper?rows=11").get_data(as_text=True)
+    assert page.count('class="card shadow-sm') == 11
+    assert "data-see-more" in page
+
+    assert card_count("/diaper?rows=2") == 5
+
+
+def test_cursor_walk_keeps_feeds_without_number(app, client):
+    with app.app_context():
+        day = date(2026, 1, 5)
+        db.session.add_all([Feed(date=day, feed_num=num, start_time=time(8 + i, 0)) for i, num in enumerate((1, 2, 3))])
+        db.session.add_all([Feed(date=day, feed_num=None, start_time=time(12 + i, 0)) for i in range(4)])
+        db.session.commit()
+        expected = {feed.id for feed in Feed.query}
+
+    seen = []
+    url = "/feed?fragment=1"
+    while url:
+        page = client.get(url).get_data(as_text=True)
+        seen += [int(feed_id) for feed_id in re.findall(r"/feed/(\d+)/edit", page)]
+        cursor = re.search(r"cursor=([\w-]+)", page)
+        url = f"/feed?fragment=1&cursor={cursor.group(1)}" if cursor else None
+
+    assert sorted(seen) == sorted(expected)
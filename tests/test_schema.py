@@ -0,0 +1,27 @@
+from datetime import date, time
+
+from sqlalchemy import text
+
+from models import db, Feed, SchemaVersion
+from schema import upgrade_schema
+
+
+def test_upgrade_renumbers_duplicate_feeds(app):
+    # A database from before versioning: no unique index, two feed #1s on one day
+    with app.app_context():
+        db.session.execute(text("DROP INDEX ix_feed_date_feed_num"))
+        SchemaVersion.query.delete()
+        db.session.add_all([
+            Feed(date=date(2026, 1, 5), feed_num=1, start_time=time(11, 0)),
+            Feed(date=date(2026, 1, 5), feed_num=1, start_time=time(8, 0)),
+        ])
+        db.session.commit()
+
+        upgrade_schema()
+
+        rows = Feed.query.order_by(Feed.start_time).all()
+        assert [row.feed_num for row in rows] == [1, 2]
+        index_sql = db.session.execute(text(
+            "SELECT sql FROM sqlite_master WHERE name = 'ix_feed_date_feed_num'"
+        )).scalar()
+        assert index_sql.startswith("CREATE UNIQUE INDEX")
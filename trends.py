@@ -0,0 +1,156 @@
+from collections import OrderedDict, defaultdict
+from datetime import date, timedelta
+import threading
+
+from sqlalchemy import func
+
+from archive import log_sources
+from daily_stats import STAT_COLUMNS
+from models import db, DailyStat, Feed
+from table_versions import read_table_versions
+
+BUCKETS = ("day", "week", "month")
+
+# Default look-back per bucket size (in buckets)
+DEFAULT_SPAN = {"day": 30, "week": 26, "month": 12}
+
+# Longest range one request may ask for
+MAX_RANGE_DAYS = 3 * 366
+
+# Tables the series are built from; any write to them invalidates memoized ranges
+TREND_TABLES = ("diapers", "feed", "sleep", "medication", "vomit", "daily_stats")
+
+# Averages come straight from the feed table; everything else from daily_stats
+FEED_AVERAGES = ("feed_rate_avg", "feed_duration_avg_min")
+
+SERIES_NAMES = STAT_COLUMNS + FEED_AVERAGES
+
+# (bucket, start, end) -> (table versions, result); small LRU
+TRENDS_CACHE_SIZE = 64
+_trends_cache = OrderedDict()
+_trends_cache_lock = threading.Lock()
+
+
+def bucket_start(day, bucket):
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())  # Monday
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(day, bucket):
+    if bucket == "week":
+        return day + timedelta(weeks=1)
+    if bucket == "month":
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=1)
+
+
+def default_range(bucket, today=None):
+    end = today or date.today()
+    start = bucket_start(end, bucket)
+    for _ in range(DEFAULT_SPAN[bucket] - 1):
+        start = bucket_start(start - timedelta(days=1), bucket)
+    return start, end
+
+
+def bucket_key(date_col, bucket):
+    # Same boundaries as bucket_start(), in SQL: ISO date of the bucket's first day
+    if bucket == "week":
+        return func.date(date_col, "weekday 0", "-6 days")
+    if bucket == "month":
+        return func.strftime("%Y-%m-01", date_col)
+    return func.date(date_col)
+
+
+def trend_series(bucket, start, end):
+    """
+    Time-bucketed series for [start, end], memoized until a log table changes.
+
+    Returns {"bucket", "start", "end", "buckets": [ISO dates],
+    "series": {name: [value per bucket]}}. Counts/totals are 0 for empty
+    buckets; averages are None.
+    """
+    key = (bucket, start, end)
+    versions = read_table_versions(TREND_TABLES)
+
+    with _trends_cache_lock:
+        cached = _trends_cache.get(key)
+        if cached is not None and cached[0] == versions:
+            _trends_cache.move_to_end(key)
+            return cached[1]
+
+    result = build_trend_series(bucket, start, end)
+
+    with _trends_cache_lock:
+        _trends_cache[key] = (versions, result)
+        _trends_cache.move_to_end(key)
+        while len(_trends_cache) > TRENDS_CACHE_SIZE:
+            _trends_cache.popitem(last=False)
+
+    return result
+
+
+def build_trend_series(bucket, start, end):
+    first = bucket_start(start, bucket)
+
+    buckets = []
+    day = first
+    while day <= end:
+        buckets.append(day.isoformat())
+        day = next_bucket(day, bucket)
+
+    position = {key: i for i, key in enumerate(buckets)}
+    series = {name: [0] * len(buckets) for name in STAT_COLUMNS}
+    series.update({name: [None] * len(buckets) for name in FEED_AVERAGES})
+
+    # Totals: one GROUP BY over the daily rollup's primary key range
+    stat_bucket = bucket_key(DailyStat.date, bucket)
+    rows = db.session.execute(
+        db.select(
+            stat_bucket,
+            *[func.sum(getattr(DailyStat, name)) for name in STAT_COLUMNS],
+        )
+        .where(DailyStat.date >= first, DailyStat.date <= end)
+        .group_by(stat_bucket)
+    )
+    for key, *totals in rows:
+        i = position[key]
+        for name, total in zip(STAT_COLUMNS, totals):
+            series[name][i] = total or 0
+
+    # Averages: GROUP BY over the indexed feed date range of the hot and
+    # archive tables, combined as sums and counts
+    sums = defaultdict(lambda: [0, 0, 0, 0])
+    for feed_rows, _ in log_sources(Feed):
+        feed_bucket = bucket_key(feed_rows.date, bucket)
+        rows = db.session.execute(
+            db.select(
+                feed_bucket,
+                func.sum(feed_rows.feed_rate),
+                func.count(feed_rows.feed_rate),
+                func.sum(feed_rows.feed_duration_min),
+                func.count(feed_rows.feed_duration_min),
+            )
+            .where(feed_rows.date >= first, feed_rows.date <= end)
+            .group_by(feed_bucket)
+        )
+        for key, *values in rows:
+            for j, value in enumerate(values):
+                sums[key][j] += value or 0
+
+    for key, (rate_sum, rate_count, duration_sum, duration_count) in sums.items():
+        i = position[key]
+        if rate_count:
+            series["feed_rate_avg"][i] = round(rate_sum / rate_count, 1)
+        if duration_count:
+            series["feed_duration_avg_min"][i] = round(duration_sum / duration_count, 1)
+
+    return {
+        "bucket": bucket,
+        "start": first.isoformat(),
+        "end": end.isoformat(),
+        "buckets": buckets,
+        "series": series,
+    }
@@ -1,3 +1,5 @@
+from assets import register_asset
+
 PAGE_THEMES = {
     "dashboard": {
         "name": "Squirtle",
@@ -91,4 +93,15 @@ PAGE_THEMES = {
         },
     }
 
-}
\ No newline at end of file
+}
+
+
+def theme_css(theme):
+    lines = [f"    {var}: {value};" for var, value in theme["vars"].items()]
+    return ":root {\n" + "\n".join(lines) + "\n}\n"
+
+
+def register_theme_stylesheets():
+    # One small cacheable sheet per theme, next to the shared static/css/base.css
+    for page_key, theme in PAGE_THEMES.items():
+        register_asset(f"css/themes/{page_key}.css", theme_css(theme).encode("utf-8"))